@@ -0,0 +1,67 @@
+"""
+Measure the cold import time of the recipe_manager package.
+
+Runs ``python -X importtime -c "import recipe_manager"`` several times in
+fresh interpreters and reports the fastest cumulative time. Exits with a
+non-zero status if it exceeds the budget or if a module that should be
+loaded lazily (tkinter, sqlite3) was imported.
+
+Usage: python benchmarks/import_time.py [--budget-ms 75] [--runs 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be pulled in by a plain "import recipe_manager"
+LAZY_MODULES = ("tkinter", "sqlite3")
+
+
+def measure_once() -> tuple:
+    """Return (cumulative microseconds, imported module names) for one run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import recipe_manager"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        modules.add(name.split(".")[0])
+        if name == "recipe_manager":
+            total_us = int(cumulative)
+    return total_us, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=75.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    best_ms = min(total for total, _ in runs) / 1000
+    eager = sorted(set(LAZY_MODULES) & runs[0][1])
+
+    print(f"import recipe_manager: {best_ms:.1f} ms (best of {args.runs}, "
+          f"budget {args.budget_ms:.0f} ms)")
+    if eager:
+        print(f"FAIL: eagerly imported {', '.join(eager)}")
+        sys.exit(1)
+    if best_ms > args.budget_ms:
+        print("FAIL: over budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
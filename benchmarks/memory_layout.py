@@ -0,0 +1,107 @@
+"""
+Compare resident memory of the recipe model layouts.
+
+Builds a book of recipes from JSON text, as RecipeStorage does, once with
+the original plain dataclasses and once with the current slotted,
+interned models, and reports the memory retained by each.
+
+Usage: python benchmarks/memory_layout.py [ingredient counts...]
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe_manager.models import Recipe  # noqa: E402
+
+INGREDIENTS_PER_RECIPE = 10
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+NAMES = [
+    "salt", "pepper", "garlic", "butter", "olive oil", "flour", "sugar",
+    "eggs", "milk", "onion", "tomato", "basil", "chicken breast", "rice",
+    "soy sauce", "ginger", "carrots", "broccoli", "lemon juice", "parsley",
+]
+AMOUNTS = ["1 tsp", "2 tbsp", "1 cup", "1/2 cup", "8 oz", "2 cloves", "pinch", "3"]
+
+
+@dataclass
+class LegacyIngredient:
+    """The original Ingredient layout: per-instance __dict__, no interning."""
+    name: str
+    amount: str
+
+
+@dataclass
+class LegacyRecipe:
+    """The original Recipe layout."""
+    title: str
+    ingredients: List[LegacyIngredient] = field(default_factory=list)
+    instructions: str = ""
+    calories: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyRecipe':
+        return cls(
+            title=data["title"],
+            ingredients=[
+                LegacyIngredient(name=ing["name"], amount=ing["amount"])
+                for ing in data.get("ingredients", [])
+            ],
+            instructions=data.get("instructions", ""),
+            calories=data.get("calories")
+        )
+
+
+def make_book_json(ingredient_count: int) -> str:
+    """Generate a recipes.json document with the given total ingredient count."""
+    rng = random.Random(42)
+    recipes = [
+        {
+            "title": f"Recipe {i}",
+            "ingredients": [
+                {"name": rng.choice(NAMES), "amount": rng.choice(AMOUNTS)}
+                for _ in range(INGREDIENTS_PER_RECIPE)
+            ],
+            "instructions": "",
+            "calories": None
+        }
+        for i in range(ingredient_count // INGREDIENTS_PER_RECIPE)
+    ]
+    return json.dumps(recipes)
+
+
+def retained_bytes(text: str, recipe_class) -> int:
+    """Return the memory kept alive by the recipes built from the JSON text."""
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    recipes = [recipe_class.from_dict(item) for item in data]
+    del data
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del recipes
+    return current
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'ingredients':>12} {'legacy MB':>10} {'slotted MB':>11} {'saved':>6}")
+    for size in sizes:
+        text = make_book_json(size)
+        legacy = retained_bytes(text, LegacyRecipe)
+        current = retained_bytes(text, Recipe)
+        saved = 1 - current / legacy
+        print(f"{size:>12,} {legacy / 2**20:>10.1f} {current / 2**20:>11.1f} {saved:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -69,8 +69,8 @@ def main():
     # Add sample recipes
     print("\n[+] Adding sample recipes...")
     sample_recipes = create_sample_recipes()
+    book.add_recipes(sample_recipes)
     for recipe in sample_recipes:
-        book.add_recipe(recipe)
         print(f"  [OK] Added: {recipe.title}")
     
     # Show all recipes
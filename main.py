@@ -3,8 +3,10 @@ Main entry point for the Recipe Manager application.
 Launches the GUI interface by default.
 """
 
+import argparse
 import sys
-from recipe_manager import RecipeBook, Recipe, Ingredient, SortBy, run_gui
+from recipe_manager import RecipeBook, Recipe, Ingredient, SortBy, StorageError
+from recipe_manager.quantities import split_ingredient_text
 
 
 def print_recipe(recipe: Recipe) -> None:
@@ -36,7 +38,7 @@ def add_recipe_interactive(book: RecipeBook) -> None:
         return
     
     # Check if recipe already exists
-    if book.get_recipe(title):
+    if book.has_recipe(title):
         response = input(f"Recipe '{title}' already exists. Overwrite? (y/n): ")
         if response.lower() != 'y':
             print("Cancelled.")
@@ -49,14 +51,7 @@ def add_recipe_interactive(book: RecipeBook) -> None:
         if not ingredient_input:
             break
         
-        # Simple parsing: assume format is "amount name" or just "name"
-        parts = ingredient_input.rsplit(' ', 1)
-        if len(parts) == 2:
-            amount, name = parts
-        else:
-            amount = "1"
-            name = parts[0]
-        
+        amount, name = split_ingredient_text(ingredient_input)
         ingredients.append(Ingredient(name=name, amount=amount))
     
     instructions = input("\nInstructions (press Enter twice to finish):\n")
@@ -141,7 +136,11 @@ def search_recipes(book: RecipeBook) -> None:
         print("No search query provided.")
         return
     
-    results = book.search_recipes(query)
+    # Best whole-word matches first, then the remaining substring
+    # matches for partial words like "chick"
+    results = book.search_ranked(query, limit=None)
+    ranked = set(map(id, results))
+    results += [recipe for recipe in book.search_recipes(query) if id(recipe) not in ranked]
     
     if not results:
         print(f"\nNo recipes found matching '{query}'.")
@@ -239,10 +238,56 @@ def main_cli():
             print("Invalid choice. Please try again.")
 
 
-if __name__ == "__main__":
-    # Launch GUI by default, or CLI if --cli flag is passed
-    if len(sys.argv) > 1 and sys.argv[1] == "--cli":
-        main_cli()
-    else:
-        run_gui()
+def import_recipes(path: str) -> None:
+    """Import recipes from a newline-delimited JSON file."""
+    book = RecipeBook()
+    count = book.import_ndjson(path)
+    print(f"Imported {count} recipe(s).", file=sys.stderr)
 
+
+def export_recipes(path: str) -> None:
+    """Export all recipes to a newline-delimited JSON file."""
+    book = RecipeBook()
+    count = book.export_ndjson(path)
+    print(f"Exported {count} recipe(s).", file=sys.stderr)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Personal Recipe Manager")
+    parser.add_argument("--cli", action="store_true", help="use the text menu instead of the GUI")
+    commands = parser.add_subparsers(dest="command")
+    
+    import_parser = commands.add_parser(
+        "import", help="import recipes from newline-delimited JSON"
+    )
+    import_parser.add_argument(
+        "file", help="file to read (.gz and .zst are decompressed; '-' for stdin)"
+    )
+    
+    export_parser = commands.add_parser(
+        "export", help="export recipes as newline-delimited JSON"
+    )
+    export_parser.add_argument(
+        "file", help="file to write (.gz and .zst are compressed; '-' for stdout)"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # A bad or missing file to import or export is the user's error, not a crash
+    errors = (StorageError, ValueError, OSError) if args.command else StorageError
+    try:
+        if args.command == "import":
+            import_recipes(args.file)
+        elif args.command == "export":
+            export_recipes(args.file)
+        elif args.cli:
+            # Launch GUI by default, or CLI if --cli flag is passed
+            main_cli()
+        else:
+            from recipe_manager import run_gui
+            run_gui()
+    except errors as e:
+        sys.exit(f"Error: {e}")
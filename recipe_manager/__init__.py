@@ -3,10 +3,38 @@ Personal Recipe Manager - A recipe management system with nutrition integration.
 """
 
 from .models import Recipe, Ingredient
+from .pantry import PantryMatcher
 from .recipe_book import RecipeBook, SortBy
-from .storage import RecipeStorage
-from .gui import run_gui
+from .storage import (RecipeStorage, JournaledRecipeStorage, Durability, StorageError,
+                      VersionConflictError)
 
 __version__ = "0.1.0"
-__all__ = ["Recipe", "Ingredient", "RecipeBook", "SortBy", "RecipeStorage", "run_gui"]
+__all__ = ["Recipe", "Ingredient", "RecipeBook", "SortBy", "RecipeStorage",
+           "JournaledRecipeStorage", "Durability", "StorageError",
+           "VersionConflictError", "PantryMatcher"]
 
+# Attributes imported on first access, so that CLI and headless users
+# don't pay for tkinter or sqlite3 unless they use them. They are left out
+# of __all__, since ``from recipe_manager import *`` would import them all.
+_LAZY_ATTRIBUTES = {
+    "run_gui": ".gui",
+    "SqliteRecipeStorage": ".sqlite_storage",
+    "NutritionService": ".nutrition",
+    "LocalNutritionProvider": ".nutrition",
+    "NutritionCache": ".nutrition",
+}
+
+
+def __getattr__(name):
+    """Import heavy submodules lazily on attribute access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,133 @@
+"""
+Column-oriented snapshot of a recipe book for analytical queries.
+"""
+
+import heapq
+import math
+from array import array
+from collections import Counter
+from itertools import chain, combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Recipe
+
+
+class RecipeColumns:
+    """
+    A read-only, column-oriented copy of a book's recipes.
+
+    Row ``i`` is the i-th recipe in book order. ``titles``,
+    ``ingredient_counts`` and ``calories`` (NaN where unknown) hold one
+    value per row. Ingredients form a sparse recipe x ingredient incidence
+    matrix in CSR layout: the distinct ingredient ids of row ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]``, in ascending order, and
+    ``ingredient_names[id]`` is the lowercase name behind an id.
+
+    The columns are ``array`` objects, so they can be handed to NumPy
+    without copying, e.g. ``numpy.frombuffer(columns.calories)``.
+    """
+
+    def __init__(self, recipes: Iterable[Recipe], revision: int = 0):
+        self.revision = revision  # Book revision the snapshot was taken at
+        self.titles: List[str] = []
+        self.ingredient_counts = array("i")
+        self.calories = array("d")
+        self.indptr = array("q", [0])
+        self.indices = array("i")
+        self.ingredient_names: List[str] = []
+        self.ingredient_ids: Dict[str, int] = {}
+        ids = self.ingredient_ids
+        for recipe in recipes:
+            self.titles.append(recipe.title)
+            self.ingredient_counts.append(len(recipe.ingredients))
+            self.calories.append(math.nan if recipe.calories is None else recipe.calories)
+            row = set()
+            for ingredient in recipe.ingredients:
+                name = ingredient.name.lower()
+                ingredient_id = ids.get(name)
+                if ingredient_id is None:
+                    ingredient_id = ids[name] = len(self.ingredient_names)
+                    self.ingredient_names.append(name)
+                row.add(ingredient_id)
+            self.indices.extend(sorted(row))
+            self.indptr.append(len(self.indices))
+        self._column_rows: Optional[List[array]] = None  # Transposed matrix, built on demand
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def row(self, row: int) -> array:
+        """Return the ingredient ids of a row."""
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def rows_with(self, name: str) -> array:
+        """Return the rows whose recipe uses the (case-insensitive) ingredient."""
+        ingredient_id = self.ingredient_ids.get(name.lower())
+        if ingredient_id is None:
+            return array("i")
+        if self._column_rows is None:
+            columns = [array("i") for _ in self.ingredient_names]
+            indptr, indices = self.indptr, self.indices
+            for row in range(len(self.titles)):
+                for position in range(indptr[row], indptr[row + 1]):
+                    columns[indices[position]].append(row)
+            self._column_rows = columns
+        return self._column_rows[ingredient_id]
+
+    def ingredient_usage(self) -> array:
+        """Return how many recipes use each ingredient, indexed by ingredient id."""
+        usage = array("i", bytes(4 * len(self.ingredient_names)))
+        for ingredient_id, count in Counter(self.indices).items():
+            usage[ingredient_id] = count
+        return usage
+
+    def top_ingredients(self, n: int = 50) -> List[Tuple[str, int]]:
+        """Return the ``n`` most used ingredients with their recipe counts."""
+        usage = self.ingredient_usage()
+        top = heapq.nlargest(n, range(len(usage)), key=usage.__getitem__)
+        return [
+            (self.ingredient_names[ingredient_id], usage[ingredient_id])
+            for ingredient_id in top
+        ]
+
+    def co_occurring(self, name: str, n: int = 10) -> List[Tuple[str, int]]:
+        """Return the ``n`` ingredients most often used together with ``name``."""
+        ingredient_id = self.ingredient_ids.get(name.lower())
+        if ingredient_id is None:
+            return []
+        indptr, indices = self.indptr, self.indices
+        counts = Counter()
+        for row in self.rows_with(name):
+            counts.update(indices[indptr[row]:indptr[row + 1]])
+        del counts[ingredient_id]
+        return [
+            (self.ingredient_names[other], count)
+            for other, count in counts.most_common(n)
+        ]
+
+    def top_pairs(self, n: int = 10) -> List[Tuple[str, str, int]]:
+        """Return the ``n`` pairs of ingredients used together most often."""
+        indptr, indices = self.indptr, self.indices
+        counts = Counter(chain.from_iterable(
+            combinations(indices[indptr[row]:indptr[row + 1]], 2)
+            for row in range(len(self.titles))
+        ))
+        names = self.ingredient_names
+        return [
+            (names[first], names[second], count)
+            for (first, second), count in counts.most_common(n)
+        ]
+
+    def mean_ingredient_count_by_calories(self, band: float = 250.0) -> Dict[float, float]:
+        """
+        Average ingredient count of recipes in each calorie band, keyed by
+        the band's lower bound. Recipes without calories are left out.
+        """
+        totals: Dict[float, List[int]] = {}
+        for calories, count in zip(self.calories, self.ingredient_counts):
+            if math.isnan(calories):
+                continue
+            entry = totals.setdefault(math.floor(calories / band) * band, [0, 0])
+            entry[0] += count
+            entry[1] += 1
+        return {start: total / rows for start, (total, rows) in sorted(totals.items())}
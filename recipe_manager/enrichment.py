@@ -0,0 +1,323 @@
+"""
+Asynchronous calorie enrichment of a whole RecipeBook over HTTP.
+
+Ingredient lookups are deduplicated across recipes, answered from the
+nutrition cache where possible, and the rest are sent in batches to a
+nutrition API (see nutrition_server for the protocol) over a bounded pool
+of keep-alive connections, throttled by a token bucket and retried with
+exponential backoff.
+"""
+
+import asyncio
+import http.client
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .models import Recipe
+from .nutrition import LookupKey, NutritionCache, NutritionService, Nutrients, ingredient_key
+from .storage import VersionConflictError
+
+# Status codes worth retrying: rate limited or temporarily unavailable
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Async rate limiter allowing ``rate`` acquisitions per second, with bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class NutritionApiError(Exception):
+    """Raised when the nutrition API keeps failing after all retries."""
+
+
+class ConnectionPool:
+    """A fixed number of keep-alive HTTP connections shared by async tasks."""
+
+    def __init__(self, base_url: str, size: int, timeout: float):
+        parts = urlsplit(base_url)
+        self.path_prefix = parts.path.rstrip("/")
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._host = parts.hostname
+        self._port = parts.port
+        self._timeout = timeout
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(self._connect())
+
+    def _connect(self) -> http.client.HTTPConnection:
+        return self._connection_class(self._host, self._port, timeout=self._timeout)
+
+    async def post(self, path: str, payload: dict) -> tuple:
+        """POST JSON on a pooled connection. Returns (status, headers, body)."""
+        connection = await self._idle.get()
+        try:
+            return await asyncio.to_thread(self._post, connection, path, payload)
+        except (OSError, http.client.HTTPException):
+            # Don't hand a broken connection to the next request
+            connection.close()
+            connection = self._connect()
+            raise
+        finally:
+            self._idle.put_nowait(connection)
+
+    def _post(self, connection, path: str, payload: dict) -> tuple:
+        body = json.dumps(payload).encode("utf-8")
+        connection.request(
+            "POST",
+            self.path_prefix + path,
+            body=body,
+            headers={"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+@dataclass
+class EnrichmentResult:
+    """Summary of an enrichment run."""
+    recipes_updated: int = 0
+    lookups: int = 0  # Distinct ingredient keys needed
+    cache_hits: int = 0
+    requests: int = 0  # HTTP requests sent, including retries
+    retries: int = 0
+    failed_batches: int = 0
+    conflicts: int = 0  # Recipes edited elsewhere during the run, left for next time
+    duplicates: int = 0  # Recipes sharing a title with an earlier one, left alone
+
+
+class AsyncEnrichmentJob:
+    """
+    Fills in calories for every recipe in a RecipeBook from a nutrition API.
+
+    Updates find recipes by title, which reaches only the first of several
+    recipes sharing a title, so later ones are left alone and counted in
+    ``duplicates``.
+
+    Example:
+        job = AsyncEnrichmentJob(book, "http://localhost:8080")
+        result = job.run()
+    """
+
+    def __init__(
+        self,
+        book,
+        base_url: str,
+        cache: Optional[NutritionCache] = None,
+        max_connections: int = 8,
+        requests_per_second: float = 20.0,
+        lookup_batch_size: int = 100,
+        write_batch_size: int = 500,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        only_missing: bool = True
+    ):
+        self.book = book
+        self.base_url = base_url
+        self.cache = cache
+        self.max_connections = max_connections
+        self.requests_per_second = requests_per_second
+        self.lookup_batch_size = lookup_batch_size
+        self.write_batch_size = write_batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.only_missing = only_missing
+
+    def run(self) -> EnrichmentResult:
+        """Run the job to completion from synchronous code."""
+        return asyncio.run(self.enrich())
+
+    async def enrich(self) -> EnrichmentResult:
+        """Look up every needed ingredient and write calories back to the book."""
+        result = EnrichmentResult()
+        recipes = []
+        for recipe in self.book.get_all_recipes():
+            if self.book.get_recipe(recipe.title) is not recipe:
+                result.duplicates += 1
+            elif not self.only_missing or recipe.calories is None:
+                recipes.append(recipe)
+        keys = list(dict.fromkeys(
+            key
+            for recipe in recipes
+            for key in map(ingredient_key, recipe.ingredients)
+            if key is not None
+        ))
+        result.lookups = len(keys)
+
+        known = self.cache.get_many(keys) if self.cache is not None else {}
+        result.cache_hits = len(known)
+        missing = [key for key in keys if key not in known]
+        if missing:
+            fetched = await self._fetch_all(missing, result)
+            if self.cache is not None and fetched:
+                self.cache.put_many(fetched)
+            known.update(fetched)
+
+        self._write_back(recipes, known, result)
+        return result
+
+    async def _fetch_all(
+        self,
+        keys: List[LookupKey],
+        result: EnrichmentResult
+    ) -> Dict[LookupKey, Optional[Nutrients]]:
+        """Fetch all keys in concurrent batches over the connection pool."""
+        pool = ConnectionPool(self.base_url, self.max_connections, self.timeout)
+        limiter = TokenBucket(self.requests_per_second)
+        batches = [
+            keys[start:start + self.lookup_batch_size]
+            for start in range(0, len(keys), self.lookup_batch_size)
+        ]
+        try:
+            answers = await asyncio.gather(
+                *(self._fetch_batch(pool, limiter, batch, result) for batch in batches),
+                return_exceptions=True
+            )
+        finally:
+            pool.close()
+        fetched = {}
+        for answer in answers:
+            if isinstance(answer, NutritionApiError):
+                result.failed_batches += 1
+            elif isinstance(answer, BaseException):
+                raise answer
+            else:
+                fetched.update(answer)
+        return fetched
+
+    async def _fetch_batch(
+        self,
+        pool: ConnectionPool,
+        limiter: TokenBucket,
+        keys: List[LookupKey],
+        result: EnrichmentResult
+    ) -> Dict[LookupKey, Optional[Nutrients]]:
+        """Send one batch, retrying with exponential backoff and jitter."""
+        payload = {
+            "items": [
+                {"name": name, "amount": amount, "unit": unit}
+                for name, amount, unit in keys
+            ]
+        }
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                result.retries += 1
+            await limiter.acquire()
+            result.requests += 1
+            retry_after = None
+            try:
+                status, headers, body = await pool.post("/nutrition", payload)
+            except (OSError, http.client.HTTPException) as e:
+                error = f"connection error: {e}"
+            else:
+                if status == 200:
+                    items = json.loads(body)["items"]
+                    return {
+                        key: (
+                            Nutrients(
+                                calories=item["calories"],
+                                protein=item.get("protein", 0.0),
+                                fat=item.get("fat", 0.0),
+                                carbs=item.get("carbs", 0.0)
+                            ) if item is not None else None
+                        )
+                        for key, item in zip(keys, items)
+                    }
+                error = f"HTTP {status}"
+                if status not in RETRY_STATUSES:
+                    break
+                retry_after = headers.get("Retry-After")
+            if attempt < self.max_retries:
+                delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+                if retry_after is not None and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                await asyncio.sleep(delay)
+        raise NutritionApiError(f"lookup batch failed: {error}")
+
+    def _write_back(
+        self,
+        recipes: List[Recipe],
+        known: Dict[LookupKey, Optional[Nutrients]],
+        result: EnrichmentResult
+    ) -> None:
+        """
+        Write new calorie values back through the book in batches.
+
+        Lookups can take a while, so recipes that were saved elsewhere since
+        they were read are skipped rather than overwritten. A batch is
+        retried at most ``max_retries`` times; recipes still conflicting
+        after that count as conflicts.
+        """
+        self.book.refresh()
+        updates = []
+        for recipe in recipes:
+            nutrients = NutritionService.total(recipe, known)
+            if nutrients is None:
+                continue
+            calories = round(nutrients.calories, 1)
+            if calories == recipe.calories:
+                continue
+            updates.append((recipe.title, Recipe(
+                title=recipe.title,
+                ingredients=list(recipe.ingredients),
+                instructions=recipe.instructions,
+                calories=calories,
+                version=recipe.version
+            )))
+        for start in range(0, len(updates), self.write_batch_size):
+            batch = updates[start:start + self.write_batch_size]
+            for _ in range(self.max_retries + 1):
+                current = [
+                    (title, recipe) for title, recipe in batch
+                    if self._is_current(title, recipe.version)
+                ]
+                result.conflicts += len(batch) - len(current)
+                batch = current
+                if not batch:
+                    break
+                try:
+                    results = self.book.update_recipes(batch, check_versions=True)
+                except VersionConflictError:
+                    continue  # The book has resynced; filter again
+                result.recipes_updated += sum(results)
+                batch = []
+                break
+            result.conflicts += len(batch)
+
+    def _is_current(self, title: str, version: int) -> bool:
+        """Check that the book still holds the given version of a recipe."""
+        recipe = self.book.get_recipe(title)
+        return recipe is not None and recipe.version == version
@@ -3,10 +3,13 @@ GUI interface for the Recipe Manager using Tkinter.
 """
 
 import tkinter as tk
+from bisect import bisect_left
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import ttk, messagebox, scrolledtext
-from typing import Optional, List
+from typing import Callable, Dict, Optional, List
 from .recipe_book import RecipeBook, SortBy
 from .models import Recipe, Ingredient
+from .storage import VersionConflictError
 
 
 class RecipeDialog:
@@ -23,6 +26,7 @@ class RecipeDialog:
         self.parent = parent
         self.recipe = recipe
         self.result = None
+        self.ingredients: List[Ingredient] = []  # Parallel to the ingredients listbox
         self.ingredient_instructions = {}  # Store instructions per ingredient
         
         self.dialog = tk.Toplevel(parent)
@@ -188,6 +192,7 @@ class RecipeDialog:
         
         # Add ingredients and store their instructions for editing
         for ingredient in self.recipe.ingredients:
+            self.ingredients.append(ingredient)
             self.ingredients_listbox.insert(tk.END, f"{ingredient.amount} {ingredient.name}")
             # Store ingredient-specific instruction if exists (for editing in the popup)
             self.ingredient_instructions[ingredient.name] = ingredient_specific.get(ingredient.name, "")
@@ -213,6 +218,7 @@ class RecipeDialog:
         
         # Add to listbox
         display_text = f"{amount} {name}"
+        self.ingredients.append(Ingredient(name=name, amount=amount))
         self.ingredients_listbox.insert(tk.END, display_text)
         
         # Initialize empty instructions for this ingredient
@@ -228,15 +234,7 @@ class RecipeDialog:
         """Remove selected ingredient from the list."""
         selection = self.ingredients_listbox.curselection()
         if selection:
-            item_text = self.ingredients_listbox.get(selection[0])
-            # Extract ingredient name (everything after the amount)
-            parts = item_text.split(" ", 2)
-            if len(parts) >= 3:
-                ingredient_name = parts[2]
-            elif len(parts) == 2:
-                ingredient_name = parts[1]
-            else:
-                ingredient_name = parts[0]
+            ingredient_name = self.ingredients.pop(selection[0]).name
             
             # Remove from listbox and instructions dict
             self.ingredients_listbox.delete(selection[0])
@@ -253,15 +251,7 @@ class RecipeDialog:
             self._hide_ingredient_instruction()
             return
         
-        item_text = self.ingredients_listbox.get(selection[0])
-        # Parse ingredient name from display text
-        parts = item_text.split(" ", 2)
-        if len(parts) >= 3:
-            ingredient_name = parts[2]
-        elif len(parts) == 2:
-            ingredient_name = parts[1]
-        else:
-            ingredient_name = parts[0]
+        ingredient_name = self.ingredients[selection[0]].name
         
         # Show instruction frame
         self.selected_ingredient_label.config(text=f"Selected: {ingredient_name}")
@@ -346,23 +336,7 @@ class RecipeDialog:
             messagebox.showerror("Error", "Recipe title is required.")
             return
         
-        # Parse ingredients
-        ingredients = []
-        for item in self.ingredients_listbox.get(0, tk.END):
-            # Parse "amount unit name" or "amount name" format
-            parts = item.split(" ", 2)
-            if len(parts) >= 3:
-                # Has unit: "2 cups flour"
-                amount = f"{parts[0]} {parts[1]}"
-                name = parts[2]
-            elif len(parts) == 2:
-                # No unit: "2 flour" or just "flour"
-                amount = parts[0]
-                name = parts[1]
-            else:
-                amount = "1"
-                name = parts[0]
-            ingredients.append(Ingredient(name=name, amount=amount))
+        ingredients = list(self.ingredients)
         
         # Get instructions from the main instructions box (already formatted with ingredient instructions)
         instructions = self.instructions_text.get("1.0", tk.END).strip()
@@ -384,9 +358,267 @@ class RecipeDialog:
         self.dialog.destroy()
 
 
+class VirtualRecipeList:
+    """
+    Recipe list that only creates Treeview rows for the visible part.
+    
+    The Treeview holds a fixed pool of rows, one per visible line plus one
+    for a partly visible line, and scrolling is handled here rather than
+    by Tk. Each redraw reuses rows that already show a recipe in the new
+    window, moving them into place, and only rewrites the values that
+    changed. Scrolling and refreshing therefore cost the same whether the
+    list holds ten recipes or a hundred thousand.
+    """
+    
+    COLUMNS = ("Title", "Ingredients", "Calories")
+    WHEEL_ROWS = 3  # Rows scrolled per mouse wheel notch
+    
+    def __init__(self, parent, on_select: Callable[[Recipe], None], rows: int = 20):
+        self.on_select = on_select
+        self.recipes: List[Recipe] = []
+        self.first = 0  # Index of the recipe shown in the top row
+        self.selected: Optional[Recipe] = None
+        self._visible_rows = rows
+        self._pool: List[str] = []  # Row item ids
+        self._showing: Dict[str, Optional[Recipe]] = {}  # Row -> recipe it shows
+        self._values: Dict[str, tuple] = {}  # Row -> values last written to Tk
+        self._order: List[str] = []  # Attached rows, top to bottom
+        
+        self.tree = ttk.Treeview(
+            parent, columns=self.COLUMNS, show="tree headings",
+            height=rows, selectmode="browse"
+        )
+        self.tree.heading("#0", text="")
+        self.tree.column("#0", width=0, stretch=False)
+        for column, width in zip(self.COLUMNS, (300, 150, 100)):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width)
+        
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        # Selection, scrolling and keyboard navigation work on list indexes;
+        # returning "break" keeps Tk from scrolling the row pool itself.
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-self.WHEEL_ROWS) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.scroll(self.WHEEL_ROWS) or "break")
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible_rows))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible_rows))
+        self.tree.bind("<Home>", lambda e: self._move_selection(-len(self.recipes)))
+        self.tree.bind("<End>", lambda e: self._move_selection(len(self.recipes)))
+        
+        self._resize_pool(rows + 1)
+    
+    def set_recipes(self, recipes: List[Recipe], keep_position: bool = False) -> None:
+        """
+        Show a new list of recipes.
+        
+        Unless ``keep_position`` is set, the view returns to the top and
+        the selection is cleared.
+        """
+        self.recipes = recipes
+        if not keep_position:
+            self.first = 0
+            self.selected = None
+        self._render()
+    
+    def selected_recipe(self) -> Optional[Recipe]:
+        """Return the selected recipe, if any."""
+        return self.selected
+    
+    def scroll(self, rows: int) -> None:
+        """Scroll the view by a number of rows (negative scrolls up)."""
+        self.scroll_to(self.first + rows)
+    
+    def scroll_to(self, index: int) -> None:
+        """Scroll so that the recipe at an index is in the top row."""
+        if index != self.first:
+            self.first = index
+            self._render()
+    
+    @staticmethod
+    def _row_values(recipe: Recipe) -> tuple:
+        """The column values shown for a recipe."""
+        calories_str = f"{recipe.calories:.0f}" if recipe.calories else "N/A"
+        return (recipe.title, f"{recipe.get_ingredient_count()} items", calories_str)
+    
+    def _render(self) -> None:
+        """Show the recipes starting at ``first``, touching only rows that changed."""
+        self.first = max(0, min(self.first, len(self.recipes) - self._visible_rows))
+        window = self.recipes[self.first:self.first + len(self._pool)]
+        
+        # Rows already showing a recipe of the new window keep it; the
+        # others are recycled for recipes that scrolled into view.
+        wanted = {id(recipe) for recipe in window}
+        reusable: Dict[int, str] = {}
+        free = []
+        for iid in self._pool:
+            recipe = self._showing[iid]
+            if recipe is not None and id(recipe) in wanted and id(recipe) not in reusable:
+                reusable[id(recipe)] = iid
+            else:
+                free.append(iid)
+        free.reverse()
+        
+        order = []
+        for recipe in window:
+            iid = reusable.pop(id(recipe), None) or free.pop()
+            self._showing[iid] = recipe
+            values = self._row_values(recipe)
+            if self._values[iid] != values:
+                self.tree.item(iid, values=values)
+                self._values[iid] = values
+            order.append(iid)
+        for iid in free:
+            self._showing[iid] = None
+        self._arrange(order)
+        
+        selected_row = next(
+            (iid for iid in order if self._showing[iid] is self.selected), None
+        ) if self.selected is not None else None
+        selection = (selected_row,) if selected_row else ()
+        if self.tree.selection() != selection:
+            self.tree.selection_set(selection)
+        
+        total = len(self.recipes)
+        if total > self._visible_rows:
+            self.scrollbar.set(self.first / total, (self.first + self._visible_rows) / total)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def _arrange(self, order: List[str]) -> None:
+        """
+        Attach exactly the rows in ``order``, in that order.
+        
+        Rows whose relative order is unchanged (the longest increasing run
+        of old positions) stay put; only the others are detached and moved.
+        """
+        positions = {iid: i for i, iid in enumerate(self._order)}
+        tails: List[int] = []  # Smallest old position ending a run of each length
+        tail_rows: List[str] = []
+        previous: Dict[str, Optional[str]] = {}
+        for iid in order:
+            position = positions.get(iid)
+            if position is None:
+                continue
+            length = bisect_left(tails, position)
+            previous[iid] = tail_rows[length - 1] if length else None
+            if length == len(tails):
+                tails.append(position)
+                tail_rows.append(iid)
+            else:
+                tails[length] = position
+                tail_rows[length] = iid
+        keep = set()
+        iid = tail_rows[-1] if tail_rows else None
+        while iid is not None:
+            keep.add(iid)
+            iid = previous[iid]
+        
+        for iid in self._order:
+            if iid not in keep:
+                self.tree.detach(iid)
+        for index, iid in enumerate(order):
+            if iid not in keep:
+                self.tree.move(iid, "", index)
+        self._order = order
+    
+    def _resize_pool(self, size: int) -> None:
+        """Grow or shrink the pool of Treeview rows."""
+        while len(self._pool) < size:
+            iid = self.tree.insert("", tk.END, values=())
+            self.tree.detach(iid)
+            self._pool.append(iid)
+            self._showing[iid] = None
+            self._values[iid] = ()
+        while len(self._pool) > size:
+            iid = self._pool.pop()
+            self.tree.delete(iid)
+            del self._showing[iid], self._values[iid]
+            if iid in self._order:
+                self._order.remove(iid)
+    
+    def _on_resize(self, event) -> None:
+        """Match the pool to the number of rows that fit the new height."""
+        bbox = self.tree.bbox(self._order[0]) if self._order else ""
+        if bbox:
+            header, row_height = bbox[1], bbox[3]
+        else:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+            header = row_height
+        rows = max(1, (event.height - header) // row_height)
+        if rows != self._visible_rows:
+            self._visible_rows = rows
+            self._resize_pool(rows + 1)
+            self._render()
+    
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "units") -> None:
+        """Handle drags and clicks on the scrollbar."""
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.recipes)))
+        elif unit == "pages":
+            self.scroll(int(amount) * self._visible_rows)
+        else:
+            self.scroll(int(amount))
+    
+    def _on_mousewheel(self, event) -> str:
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-notches * self.WHEEL_ROWS)
+        return "break"
+    
+    def _on_click(self, event) -> Optional[str]:
+        """Select the clicked recipe; headings and separators keep Tk's handling."""
+        if self.tree.identify_region(event.x, event.y) not in ("tree", "cell"):
+            return None
+        self.tree.focus_set()
+        recipe = self._showing.get(self.tree.identify_row(event.y))
+        if recipe is not None:
+            self._select(recipe)
+        return "break"
+    
+    def _move_selection(self, rows: int) -> str:
+        """Move the selection by a number of rows, scrolling to keep it visible."""
+        if not self.recipes:
+            return "break"
+        current = next(
+            (self.first + i for i, iid in enumerate(self._order)
+             if self._showing[iid] is self.selected),
+            None
+        )
+        if current is None:
+            index = self.first if rows > 0 else self.first + self._visible_rows - 1
+        else:
+            index = current + rows
+        index = max(0, min(index, len(self.recipes) - 1))
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self._visible_rows:
+            self.first = index - self._visible_rows + 1
+        self._select(self.recipes[index])
+        return "break"
+    
+    def _select(self, recipe: Recipe) -> None:
+        self.selected = recipe
+        self._render()
+        self.on_select(recipe)
+
+
 class RecipeManagerGUI:
     """Main GUI application for Recipe Manager."""
     
+    SEARCH_DELAY_MS = 150  # Pause in typing before a search starts
+    POLL_INTERVAL_MS = 16  # How often to check for search results (~60 fps)
+    LOAD_POLL_MS = 100  # How often to show newly loaded recipes at startup
+    SIMILAR_COUNT = 5  # Similar recipes listed under a recipe's details
+    SIMILARITY_BANDS = 16  # MinHash bands; more find weaker matches, at a memory cost
+    SIMILARITY_ROWS = 3  # MinHash rows per band; more keep only closer matches
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Personal Recipe Manager")
@@ -398,11 +630,29 @@ class RecipeManagerGUI:
         y = (self.root.winfo_screenheight() // 2) - (700 // 2)
         self.root.geometry(f"1000x700+{x}+{y}")
         
-        self.book = RecipeBook()
+        # The book is loaded on the worker thread after the window is up
+        self.book = RecipeBook(
+            autoload=False,
+            similarity_bands=self.SIMILARITY_BANDS,
+            similarity_rows=self.SIMILARITY_ROWS
+        )
         self.current_recipes: List[Recipe] = []
         
+        # Loading and searches run on a worker thread so the window never blocks
+        self._worker = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="recipe-worker"
+        )
+        self._search_job: Optional[str] = None  # Pending debounce timer
+        self._search_future: Optional[Future] = None
+        self._search_serial = 0  # Bumped per search; older results are dropped
+        self._view_serial = 0  # Bumped when the details change; stale similar recipes are dropped
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._load_progress = (0, 0)  # (loaded, total), written by the worker
+        self._shown_count = 0
+        self._book_controls = []  # Widgets disabled until the book has loaded
+        
         self._create_widgets()
-        self._refresh_recipe_list()
+        self._start_loading()
     
     def _create_widgets(self):
         """Create the main GUI widgets."""
@@ -445,6 +695,7 @@ class RecipeManagerGUI:
             pady=8,
             cursor="hand2"
         )
+        self._book_controls.append(add_btn)
         add_btn.pack(fill="x", pady=(0, 5))
         
         edit_btn = tk.Button(
@@ -459,6 +710,7 @@ class RecipeManagerGUI:
             pady=8,
             cursor="hand2"
         )
+        self._book_controls.append(edit_btn)
         edit_btn.pack(fill="x", pady=(0, 5))
         
         delete_btn = tk.Button(
@@ -473,6 +725,7 @@ class RecipeManagerGUI:
             pady=8,
             cursor="hand2"
         )
+        self._book_controls.append(delete_btn)
         delete_btn.pack(fill="x", pady=(0, 15))
         
         # Search frame
@@ -480,10 +733,12 @@ class RecipeManagerGUI:
         search_frame.pack(fill="x", pady=(0, 10))
         
         self.search_entry = ttk.Entry(search_frame, font=("Arial", 10))
+        self._book_controls.append(self.search_entry)
         self.search_entry.pack(fill="x", pady=(0, 5))
-        self.search_entry.bind("<KeyRelease>", lambda e: self._on_search())
+        self.search_entry.bind("<KeyRelease>", lambda e: self._schedule_search())
         
         search_btn = ttk.Button(search_frame, text="Search", command=self._on_search)
+        self._book_controls.append(search_btn)
         search_btn.pack(fill="x")
         
         # Filter frame
@@ -492,16 +747,20 @@ class RecipeManagerGUI:
         
         ttk.Label(filter_frame, text="Include:").pack(anchor="w")
         self.include_entry = ttk.Entry(filter_frame, font=("Arial", 9))
+        self._book_controls.append(self.include_entry)
         self.include_entry.pack(fill="x", pady=(2, 8))
         
         ttk.Label(filter_frame, text="Exclude:").pack(anchor="w")
         self.exclude_entry = ttk.Entry(filter_frame, font=("Arial", 9))
+        self._book_controls.append(self.exclude_entry)
         self.exclude_entry.pack(fill="x", pady=(2, 8))
         
         filter_btn = ttk.Button(filter_frame, text="Apply Filter", command=self._apply_filter)
+        self._book_controls.append(filter_btn)
         filter_btn.pack(fill="x", pady=(5, 0))
         
         clear_filter_btn = ttk.Button(filter_frame, text="Clear Filter", command=self._clear_filter)
+        self._book_controls.append(clear_filter_btn)
         clear_filter_btn.pack(fill="x")
         
         # Sort frame
@@ -509,10 +768,15 @@ class RecipeManagerGUI:
         sort_frame.pack(fill="x")
         
         self.sort_var = tk.StringVar(value="none")
-        ttk.Radiobutton(sort_frame, text="None", variable=self.sort_var, value="none", command=self._apply_sort).pack(anchor="w")
-        ttk.Radiobutton(sort_frame, text="Alphabetical", variable=self.sort_var, value="alphabetical", command=self._apply_sort).pack(anchor="w")
-        ttk.Radiobutton(sort_frame, text="Ingredient Count", variable=self.sort_var, value="ingredient_count", command=self._apply_sort).pack(anchor="w")
-        ttk.Radiobutton(sort_frame, text="Calories", variable=self.sort_var, value="calories", command=self._apply_sort).pack(anchor="w")
+        for text, value in (
+            ("None", "none"),
+            ("Alphabetical", "alphabetical"),
+            ("Ingredient Count", "ingredient_count"),
+            ("Calories", "calories"),
+        ):
+            radio = ttk.Radiobutton(sort_frame, text=text, variable=self.sort_var, value=value, command=self._apply_sort)
+            radio.pack(anchor="w")
+            self._book_controls.append(radio)
         
         # Right panel - Recipe list
         right_panel = tk.Frame(main_container)
@@ -522,28 +786,17 @@ class RecipeManagerGUI:
         list_frame = ttk.LabelFrame(right_panel, text="Recipes", padding=10)
         list_frame.pack(fill="both", expand=True)
         
-        # Treeview for recipe list
-        columns = ("Title", "Ingredients", "Calories")
-        self.recipe_tree = ttk.Treeview(list_frame, columns=columns, show="tree headings", height=20)
-        self.recipe_tree.heading("#0", text="")
-        self.recipe_tree.heading("Title", text="Title")
-        self.recipe_tree.heading("Ingredients", text="Ingredients")
-        self.recipe_tree.heading("Calories", text="Calories")
-        
-        self.recipe_tree.column("#0", width=0, stretch=False)
-        self.recipe_tree.column("Title", width=300)
-        self.recipe_tree.column("Ingredients", width=150)
-        self.recipe_tree.column("Calories", width=100)
-        
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.recipe_tree.yview)
-        self.recipe_tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.recipe_tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Shown while the book loads in the background
+        self.loading_frame = tk.Frame(list_frame)
+        self.loading_frame.pack(fill="x", pady=(0, 5))
+        self.loading_label = ttk.Label(self.loading_frame, text="Loading recipes...")
+        self.loading_label.pack(side="left")
+        self.loading_bar = ttk.Progressbar(self.loading_frame, mode="indeterminate")
+        self.loading_bar.pack(side="left", fill="x", expand=True, padx=(10, 0))
         
-        # Bind click events to view recipe details
-        self.recipe_tree.bind("<ButtonRelease-1>", lambda e: self._view_recipe())
-        self.recipe_tree.bind("<Double-1>", lambda e: self._view_recipe())
+        # Virtualized list: only the visible rows exist as Treeview items
+        self.recipe_list = VirtualRecipeList(list_frame, on_select=lambda r: self._view_recipe())
+        self.recipe_list.tree.bind("<Double-1>", lambda e: self._view_recipe())
         
         # Recipe details frame
         details_frame = ttk.LabelFrame(right_panel, text="Recipe Details", padding=10)
@@ -553,26 +806,54 @@ class RecipeManagerGUI:
         self.details_text.pack(fill="both", expand=True)
         self.details_text.config(state="disabled")
     
+    def _start_loading(self):
+        """Load the book on the worker thread, showing recipes as they arrive."""
+        for widget in self._book_controls:
+            widget.configure(state="disabled")
+        self.loading_bar.start()
+        future = self._worker.submit(self.book.load, progress=self._on_load_progress)
+        self.root.after(self.LOAD_POLL_MS, self._poll_loading, future)
+    
+    def _on_load_progress(self, loaded: int, total: int):
+        """Record loading progress; called on the worker thread."""
+        self._load_progress = (loaded, total)
+    
+    def _poll_loading(self, future: Future):
+        """Update the progress bar and the list until loading finishes."""
+        loaded, total = self._load_progress
+        if total:
+            if str(self.loading_bar["mode"]) != "determinate":
+                self.loading_bar.stop()
+                self.loading_bar.configure(mode="determinate", maximum=total)
+            self.loading_bar["value"] = loaded
+            self.loading_label.configure(text=f"Loading recipes... {loaded} of {total}")
+        if loaded != self._shown_count:
+            self._shown_count = loaded
+            self.current_recipes = self.book.get_all_recipes()
+            self.recipe_list.set_recipes(self.current_recipes, keep_position=True)
+        
+        if not future.done():
+            self.root.after(self.LOAD_POLL_MS, self._poll_loading, future)
+            return
+        self.loading_bar.stop()
+        self.loading_frame.pack_forget()
+        error = future.exception()
+        if error is not None:
+            messagebox.showerror("Error", f"Could not load recipes: {error}")
+            return
+        for widget in self._book_controls:
+            widget.configure(state="normal")
+        self.current_recipes = self.book.get_all_recipes()
+        self.recipe_list.set_recipes(self.current_recipes, keep_position=True)
+    
     def _refresh_recipe_list(self):
         """Refresh the recipe list display."""
-        # Clear existing items
-        for item in self.recipe_tree.get_children():
-            self.recipe_tree.delete(item)
-        
         # Get current recipes
         if not self.current_recipes:
             self.current_recipes = self.book.get_all_recipes()
         
-        # Add recipes to tree
-        for recipe in self.current_recipes:
-            calories_str = f"{recipe.calories:.0f}" if recipe.calories else "N/A"
-            self.recipe_tree.insert(
-                "",
-                tk.END,
-                text="",
-                values=(recipe.title, f"{recipe.get_ingredient_count()} items", calories_str),
-                tags=(recipe.title,)
-            )
+        # Only the visible rows are redrawn, however long the list is
+        self.recipe_list.set_recipes(self.current_recipes)
         
         # Update count
         count = len(self.current_recipes)
@@ -591,13 +872,12 @@ class RecipeManagerGUI:
     
     def _edit_recipe(self):
         """Open dialog to edit selected recipe."""
-        selection = self.recipe_tree.selection()
-        if not selection:
+        selected = self.recipe_list.selected_recipe()
+        if selected is None:
             messagebox.showwarning("Warning", "Please select a recipe to edit.")
             return
         
-        item = self.recipe_tree.item(selection[0])
-        title = item["values"][0]
+        title = selected.title
         
         recipe = self.book.get_recipe(title)
         if not recipe:
@@ -608,19 +888,27 @@ class RecipeManagerGUI:
         self.root.wait_window(dialog.dialog)
         
         if dialog.result:
-            self.book.update_recipe(title, dialog.result)
+            try:
+                self.book.update_recipe(title, dialog.result, expected_version=recipe.version)
+            except VersionConflictError:
+                self._clear_filter()
+                messagebox.showerror(
+                    "Error",
+                    f"'{title}' was changed by another program while you were editing it. "
+                    "The latest version has been loaded; please make your changes again."
+                )
+                return
             self._clear_filter()
             messagebox.showinfo("Success", f"Recipe '{dialog.result.title}' updated successfully!")
     
     def _delete_recipe(self):
         """Delete selected recipe."""
-        selection = self.recipe_tree.selection()
-        if not selection:
+        selected = self.recipe_list.selected_recipe()
+        if selected is None:
             messagebox.showwarning("Warning", "Please select a recipe to delete.")
             return
         
-        item = self.recipe_tree.item(selection[0])
-        title = item["values"][0]
+        title = selected.title
         
         if messagebox.askyesno("Confirm", f"Are you sure you want to delete '{title}'?"):
             if self.book.delete_recipe(title):
@@ -631,15 +919,8 @@ class RecipeManagerGUI:
     
     def _view_recipe(self):
         """View details of selected recipe."""
-        selection = self.recipe_tree.selection()
-        if not selection:
-            return
-        
-        item = self.recipe_tree.item(selection[0])
-        title = item["values"][0]
-        
-        recipe = self.book.get_recipe(title)
-        if not recipe:
+        recipe = self.recipe_list.selected_recipe()
+        if recipe is None:
             return
         
         # Format recipe details
@@ -660,18 +941,71 @@ class RecipeManagerGUI:
         self.details_text.delete("1.0", tk.END)
         self.details_text.insert("1.0", details)
         self.details_text.config(state="disabled")
+        
+        # Finding similar recipes may build the similarity index, so it runs
+        # on the worker thread and the list is appended when ready
+        self._view_serial += 1
+        future = self._worker.submit(self.book.similar_recipes, recipe.title, self.SIMILAR_COUNT)
+        self._poll_similar(future, self._view_serial)
+    
+    def _poll_similar(self, future: Future, serial: int):
+        """Append similar recipes to the details once they are found."""
+        if serial != self._view_serial:
+            return  # Another recipe is shown now
+        if not future.done():
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_similar, future, serial)
+            return
+        if future.exception() is not None or not future.result():
+            return
+        
+        details = "\nSimilar recipes:\n"
+        for similar in future.result():
+            details += f"  • {similar.title}\n"
+        self.details_text.config(state="normal")
+        self.details_text.insert(tk.END, details)
+        self.details_text.config(state="disabled")
+    
+    def _schedule_search(self):
+        """Restart the debounce timer after a keystroke."""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(self.SEARCH_DELAY_MS, self._on_search)
     
     def _on_search(self):
-        """Handle search input."""
+        """Start searching for the entry's text on the worker thread."""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
+        
+        # Supersede the previous search: drop it if it hasn't started yet,
+        # and ignore its results if it has
+        self._search_serial += 1
+        if self._search_future is not None:
+            self._search_future.cancel()
+            self._search_future = None
+        
         query = self.search_entry.get().strip()
         if not query:
             self._clear_filter()
             return
         
-        self.current_recipes = self.book.search_recipes(query)
+        self._search_future = self._worker.submit(self.book.search_recipes, query)
+        self._poll_search(self._search_future, self._search_serial)
+    
+    def _poll_search(self, future: Future, serial: int):
+        """Show a search's results on the Tk thread once it finishes."""
+        if serial != self._search_serial:
+            return  # A newer search has started
+        if not future.done():
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_search, future, serial)
+            return
+        self._search_future = None
+        
+        self.current_recipes = future.result()
         self._refresh_recipe_list()
         # Clear details if no results
         if not self.current_recipes:
+            self._view_serial += 1
             self.details_text.config(state="normal")
             self.details_text.delete("1.0", tk.END)
             self.details_text.config(state="disabled")
@@ -699,6 +1033,7 @@ class RecipeManagerGUI:
         self.exclude_entry.delete(0, tk.END)
         self.sort_var.set("none")
         self._refresh_recipe_list()
+        self._view_serial += 1
         self.details_text.config(state="normal")
         self.details_text.delete("1.0", tk.END)
         self.details_text.config(state="disabled")
@@ -717,6 +1052,11 @@ class RecipeManagerGUI:
             self.current_recipes = self.book.sort_recipes(SortBy.CALORIES, reverse=True)
         
         self._refresh_recipe_list()
+    
+    def _on_close(self):
+        """Stop the search worker and close the window."""
+        self._worker.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
 
 def run_gui():
@@ -0,0 +1,165 @@
+"""
+In-memory indexes used by RecipeBook for fast lookups.
+"""
+
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set
+
+from .models import Recipe
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of three-character substrings of a string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Substring index over short lowercase strings.
+
+    Each string is split into trigrams that map to the keys containing
+    them. A query is narrowed to the keys holding all of its trigrams
+    before the exact substring check runs on that candidate set.
+    """
+
+    def __init__(self):
+        self._texts: Dict[Hashable, str] = {}
+        self._postings: Dict[str, Set[Hashable]] = {}
+
+    def add(self, key: Hashable, text: str) -> None:
+        """Index a (lowercase) string under the given key."""
+        self._texts[key] = text
+        for gram in trigrams(text):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove the string stored under the given key."""
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+        for gram in trigrams(text):
+            postings = self._postings[gram]
+            postings.discard(key)
+            if not postings:
+                del self._postings[gram]
+
+    def search(self, query: str) -> Set[Hashable]:
+        """Return the keys whose string contains the (lowercase) query."""
+        grams = trigrams(query)
+        if not grams:
+            # Too short to narrow down; check every string.
+            return {key for key, text in self._texts.items() if query in text}
+        postings = []
+        for gram in grams:
+            keys = self._postings.get(gram)
+            if not keys:
+                return set()
+            postings.append(keys)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        if len(query) == 3:
+            return candidates
+        return {key for key in candidates if query in self._texts[key]}
+
+
+class IngredientIndex:
+    """
+    Inverted index from lowercase ingredient name to recipe ids.
+
+    Filters match a term anywhere inside an ingredient name, so a term is
+    resolved against the vocabulary of distinct names, which is much
+    smaller than the total number of ingredients in the book.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary = TrigramIndex()
+
+    def add(self, recipe_id: int, recipe: Recipe) -> None:
+        """Index the ingredient names of a recipe."""
+        for name in {ing.name.lower() for ing in recipe.ingredients}:
+            postings = self._postings.get(name)
+            if postings is None:
+                postings = self._postings[name] = set()
+                self._vocabulary.add(name, name)
+            postings.add(recipe_id)
+
+    def remove(self, recipe_id: int, recipe: Recipe) -> None:
+        """Remove a recipe's ingredient names from the index."""
+        for name in {ing.name.lower() for ing in recipe.ingredients}:
+            postings = self._postings.get(name)
+            if postings is None:
+                continue
+            postings.discard(recipe_id)
+            if not postings:
+                del self._postings[name]
+                self._vocabulary.remove(name)
+
+    def names(self) -> Iterable[str]:
+        """Return the distinct ingredient names in the index."""
+        return self._postings.keys()
+
+    def names_matching(self, term: str) -> List[str]:
+        """Return the ingredient names containing the (lowercase) term."""
+        return list(self._vocabulary.search(term))
+
+    def recipes_with_name(self, name: str) -> Set[int]:
+        """Return ids of recipes using exactly this (lowercase) name."""
+        return self._postings.get(name, set())
+
+    def recipes_matching(self, term: str) -> Set[int]:
+        """Return ids of recipes with an ingredient name containing the term."""
+        names = self.names_matching(term.lower())
+        if len(names) == 1:
+            return set(self._postings[names[0]])
+        return set().union(*(self._postings[name] for name in names))
+
+
+class SortedView:
+    """
+    Recipe ids kept ordered by a sort key.
+
+    Entries are ``(key, recipe_id)`` tuples held in a bisect-maintained
+    list, so ties stay in book order and a change costs a binary search
+    plus a list insert or delete rather than a full re-sort.
+    """
+
+    def __init__(self, key: Callable[[Recipe], Any], recipes: Dict[int, Recipe]):
+        """Build the view over the given id -> recipe mapping."""
+        self._key = key
+        self._keys: Dict[int, Any] = {
+            recipe_id: key(recipe) for recipe_id, recipe in recipes.items()
+        }
+        self._entries: List[tuple] = sorted(
+            (k, recipe_id) for recipe_id, k in self._keys.items()
+        )
+
+    def add(self, recipe_id: int, recipe: Recipe) -> None:
+        """Insert a recipe at its sorted position."""
+        k = self._key(recipe)
+        self._keys[recipe_id] = k
+        insort(self._entries, (k, recipe_id))
+
+    def remove(self, recipe_id: int) -> None:
+        """Remove a recipe from the view."""
+        k = self._keys.pop(recipe_id)
+        del self._entries[bisect_left(self._entries, (k, recipe_id))]
+
+    def ids(self, reverse: bool = False) -> List[int]:
+        """
+        Return recipe ids in sorted order.
+
+        Like ``list.sort(reverse=True)``, a descending view keeps recipes
+        with equal keys in book order.
+        """
+        entries = self._entries
+        if not reverse:
+            return [recipe_id for _, recipe_id in entries]
+        result = []
+        end = len(entries)
+        while end > 0:
+            # (key,) sorts before every (key, recipe_id) with the same key
+            start = bisect_left(entries, (entries[end - 1][0],), 0, end)
+            result.extend(recipe_id for _, recipe_id in entries[start:end])
+            end = start
+        return result
@@ -2,27 +2,51 @@
 Data models for the Recipe Manager application.
 """
 
+import sys
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from .quantities import Quantity, check_factor, parse_amount, scale_amount
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Ingredient:
-    """Represents a single ingredient with its amount."""
+    """
+    Represents a single ingredient with its amount.
+    
+    Ingredients are immutable and slotted. Names and amounts repeat across
+    thousands of recipes ("salt", "1 tsp"), so both are interned to share
+    a single string object per distinct value.
+    """
     name: str
     amount: str  # e.g., "2 cups", "1 tsp", "500g"
     
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "amount", sys.intern(self.amount))
+    
+    @property
+    def quantity(self) -> Optional[Quantity]:
+        """The parsed amount, or None if it can't be understood."""
+        return parse_amount(self.amount)
+    
     def __str__(self) -> str:
         return f"{self.amount} {self.name}"
 
 
-@dataclass
+def scale_calories(calories: Optional[float], factor: float) -> Optional[float]:
+    """Scale a recipe's calories, keeping None for unknown values."""
+    return None if calories is None else round(calories * factor, 1)
+
+
+@dataclass(slots=True)
 class Recipe:
     """Represents a recipe with title, ingredients, and instructions."""
     title: str
     ingredients: List[Ingredient] = field(default_factory=list)
     instructions: str = ""
     calories: Optional[float] = None  # Will be populated by API integration
+    version: int = 0  # Bumped by storage on every save; 0 if never saved
     
     def __str__(self) -> str:
         return self.title
@@ -31,6 +55,31 @@ class Recipe:
         """Returns the number of ingredients in the recipe."""
         return len(self.ingredients)
     
+    def copy(self) -> 'Recipe':
+        """Return a copy with its own ingredient list; ingredients are immutable."""
+        return Recipe(
+            self.title, list(self.ingredients), self.instructions, self.calories, self.version
+        )
+    
+    def scale(self, factor: float) -> 'Recipe':
+        """
+        Return a copy with every amount, and the calories, multiplied by a
+        factor. Amounts are re-rendered in a readable unit, so doubling
+        "3/4 cup" gives "1 1/2 cups" and halving "2 tbsp" gives "1 tbsp".
+        Raises ValueError unless the factor is positive.
+        """
+        check_factor(factor)
+        return Recipe(
+            title=self.title,
+            ingredients=[
+                Ingredient(ing.name, scale_amount(ing.amount, factor))
+                for ing in self.ingredients
+            ],
+            instructions=self.instructions,
+            calories=scale_calories(self.calories, factor),
+            version=self.version
+        )
+    
     def to_dict(self) -> dict:
         """Converts recipe to dictionary for JSON storage."""
         return {
@@ -40,7 +89,8 @@ class Recipe:
                 for ing in self.ingredients
             ],
             "instructions": self.instructions,
-            "calories": self.calories
+            "calories": self.calories,
+            "version": self.version
         }
     
     @classmethod
@@ -54,6 +104,7 @@ class Recipe:
             title=data["title"],
             ingredients=ingredients,
             instructions=data.get("instructions", ""),
-            calories=data.get("calories")
+            calories=data.get("calories"),
+            version=data.get("version", 0)
         )
 
@@ -0,0 +1,355 @@
+"""
+Nutrition lookups for recipes: providers, an on-disk cache, and a service
+that computes calories and macros from ingredients.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Ingredient, Recipe
+from .quantities import UNITS, Dimension
+
+# (normalized ingredient name, amount in base unit, base unit)
+LookupKey = Tuple[str, float, str]
+
+TABLE_FILE = os.path.join(os.path.dirname(__file__), "data", "nutrition_table.json")
+
+
+@dataclass(frozen=True, slots=True)
+class Nutrients:
+    """Calories (kcal) and macronutrients (grams) of some amount of food."""
+    calories: float = 0.0
+    protein: float = 0.0
+    fat: float = 0.0
+    carbs: float = 0.0
+
+    def __add__(self, other: 'Nutrients') -> 'Nutrients':
+        return Nutrients(
+            calories=self.calories + other.calories,
+            protein=self.protein + other.protein,
+            fat=self.fat + other.fat,
+            carbs=self.carbs + other.carbs
+        )
+
+    def scaled(self, factor: float) -> 'Nutrients':
+        """Return these nutrients multiplied by a factor."""
+        return Nutrients(
+            calories=self.calories * factor,
+            protein=self.protein * factor,
+            fat=self.fat * factor,
+            carbs=self.carbs * factor
+        )
+
+    def to_list(self) -> List[float]:
+        """Converts nutrients to a list for compact JSON storage."""
+        return [self.calories, self.protein, self.fat, self.carbs]
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> 'Nutrients':
+        """Creates Nutrients from a list made by to_list."""
+        return cls(*values)
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase an ingredient name and collapse its whitespace."""
+    return " ".join(name.lower().split())
+
+
+def ingredient_key(ingredient: Ingredient) -> Optional[LookupKey]:
+    """
+    Return the cache/lookup key for an ingredient, or None if its amount
+    can't be parsed.
+
+    Volumes are keyed in ml and masses in g, rounded to a tenth so that
+    the rounding in unit sizes doesn't split entries: "1 cup" (236.588 ml)
+    and "16 tbsp" (236.589 ml) of the same ingredient share one.
+    """
+    quantity = ingredient.quantity
+    if quantity is None:
+        return None
+    if quantity.dimension == Dimension.VOLUME:
+        unit = "ml"
+    elif quantity.dimension == Dimension.MASS:
+        unit = "g"
+    else:
+        unit = quantity.unit
+    return (normalize_name(ingredient.name), round(quantity.base_value, 1), unit)
+
+
+class NutritionProvider(ABC):
+    """
+    Base class for sources of nutrition data.
+
+    Subclasses implement lookup_batch, which answers many keys in one call.
+    Keys the provider knows nothing about map to None.
+    """
+
+    max_batch_size = 100
+
+    @abstractmethod
+    def lookup_batch(self, keys: List[LookupKey]) -> Dict[LookupKey, Optional[Nutrients]]:
+        """Look up nutrients for a batch of ingredient keys."""
+
+
+class LocalNutritionProvider(NutritionProvider):
+    """
+    Provider backed by the nutrition table bundled with the package.
+
+    Useful offline and in tests. Names are matched after dropping plural
+    endings and leading words, so "large eggs" finds "egg".
+    """
+
+    max_batch_size = 1000
+
+    def __init__(self, table_file: str = TABLE_FILE):
+        with open(table_file, 'r', encoding='utf-8') as f:
+            self.table = {
+                name: entry for name, entry in json.load(f).items()
+                if not name.startswith("_")
+            }
+
+    def find_entry(self, name: str) -> Optional[dict]:
+        """Find the table entry for a normalized ingredient name."""
+        words = name.split()
+        if not words:
+            return None
+        last = words[-1]
+        singulars = [last]
+        if last.endswith("es"):
+            singulars.append(last[:-2])
+        if last.endswith("s"):
+            singulars.append(last[:-1])
+        for start in range(len(words)):
+            for singular in singulars:
+                entry = self.table.get(" ".join(words[start:-1] + [singular]))
+                if entry is not None:
+                    return entry
+        return None
+
+    def nutrients_for(self, key: LookupKey) -> Optional[Nutrients]:
+        """Compute the nutrients for one ingredient key."""
+        name, amount, unit = key
+        entry = self.find_entry(name)
+        if entry is None:
+            return None
+        dimension = UNITS[unit][0] if unit in UNITS else Dimension.COUNT
+        if dimension == Dimension.MASS:
+            grams = amount
+        elif dimension == Dimension.VOLUME:
+            grams = amount * entry.get("grams_per_ml", 1.0)
+        elif "grams_per_unit" in entry:
+            grams = amount * entry["grams_per_unit"]
+        else:
+            return None
+        per_100g = Nutrients(
+            calories=entry["calories"],
+            protein=entry["protein"],
+            fat=entry["fat"],
+            carbs=entry["carbs"]
+        )
+        return per_100g.scaled(grams / 100)
+
+    def lookup_batch(self, keys: List[LookupKey]) -> Dict[LookupKey, Optional[Nutrients]]:
+        """Look up nutrients for a batch of ingredient keys."""
+        return {key: self.nutrients_for(key) for key in keys}
+
+
+class NutritionCache:
+    """
+    On-disk cache of provider answers, stored in SQLite.
+
+    Entries expire ``ttl`` seconds after they were fetched. When the cache
+    holds more than ``max_entries``, the least recently used are evicted.
+    "Not found" answers are cached too, so unknown ingredients aren't
+    looked up again on every run.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = "nutrition_cache.db",
+        ttl: float = 30 * 24 * 3600,
+        max_entries: int = 100_000
+    ):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_file, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS nutrition_cache ("
+                "name TEXT NOT NULL, amount REAL NOT NULL, unit TEXT NOT NULL, "
+                "nutrients TEXT, fetched_at REAL NOT NULL, used_at REAL NOT NULL, "
+                "PRIMARY KEY (name, amount, unit))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_nutrition_cache_used_at "
+                "ON nutrition_cache (used_at)"
+            )
+
+    def get_many(self, keys: Iterable[LookupKey]) -> Dict[LookupKey, Optional[Nutrients]]:
+        """Return cached answers for the keys that are present and fresh."""
+        now = time.time()
+        oldest = now - self.ttl
+        found = {}
+        with self._lock, self._conn:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT nutrients FROM nutrition_cache "
+                    "WHERE name = ? AND amount = ? AND unit = ? AND fetched_at >= ?",
+                    (*key, oldest)
+                ).fetchone()
+                if row is not None:
+                    found[key] = (
+                        Nutrients.from_list(json.loads(row[0]))
+                        if row[0] is not None else None
+                    )
+            self._conn.executemany(
+                "UPDATE nutrition_cache SET used_at = ? "
+                "WHERE name = ? AND amount = ? AND unit = ?",
+                [(now, *key) for key in found]
+            )
+        return found
+
+    def put_many(self, entries: Dict[LookupKey, Optional[Nutrients]]) -> None:
+        """Store provider answers, evicting expired and least recently used entries."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO nutrition_cache "
+                "(name, amount, unit, nutrients, fetched_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        *key,
+                        json.dumps(nutrients.to_list()) if nutrients is not None else None,
+                        now,
+                        now
+                    )
+                    for key, nutrients in entries.items()
+                ]
+            )
+            self._conn.execute(
+                "DELETE FROM nutrition_cache WHERE fetched_at < ?", (now - self.ttl,)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM nutrition_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM nutrition_cache WHERE rowid IN ("
+                    "SELECT rowid FROM nutrition_cache ORDER BY used_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM nutrition_cache")
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
+
+
+class NutritionService:
+    """
+    Computes recipe nutrition from ingredients.
+
+    Lookups go to the cache first; the remaining keys are deduplicated and
+    sent to the provider in batches of its ``max_batch_size``.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[NutritionProvider] = None,
+        cache: Optional[NutritionCache] = None
+    ):
+        self.provider = provider or LocalNutritionProvider()
+        self.cache = cache
+        self.provider_calls = 0
+
+    def lookup(self, keys: Iterable[LookupKey]) -> Dict[LookupKey, Optional[Nutrients]]:
+        """Look up nutrients for ingredient keys, using the cache when possible."""
+        keys = list(dict.fromkeys(keys))
+        results = self.cache.get_many(keys) if self.cache is not None else {}
+        missing = [key for key in keys if key not in results]
+        fetched = {}
+        batch_size = self.provider.max_batch_size
+        for start in range(0, len(missing), batch_size):
+            fetched.update(self.provider.lookup_batch(missing[start:start + batch_size]))
+            self.provider_calls += 1
+        if fetched and self.cache is not None:
+            self.cache.put_many(fetched)
+        results.update(fetched)
+        return results
+
+    @staticmethod
+    def total(
+        recipe: Recipe,
+        known: Dict[LookupKey, Optional[Nutrients]]
+    ) -> Optional[Nutrients]:
+        """
+        Sum the nutrients of a recipe's ingredients from looked-up values.
+
+        Ingredients without data are skipped; returns None if none had any.
+        """
+        total = None
+        for ingredient in recipe.ingredients:
+            key = ingredient_key(ingredient)
+            nutrients = known.get(key) if key is not None else None
+            if nutrients is not None:
+                total = nutrients if total is None else total + nutrients
+        return total
+
+    def analyze(self, recipes: Iterable[Recipe]) -> List[Optional[Nutrients]]:
+        """Compute nutrition for many recipes with one deduplicated lookup."""
+        recipes = list(recipes)
+        keys = [
+            key
+            for recipe in recipes
+            for key in map(ingredient_key, recipe.ingredients)
+            if key is not None
+        ]
+        known = self.lookup(keys)
+        return [self.total(recipe, known) for recipe in recipes]
+
+    def recipe_nutrition(self, recipe: Recipe) -> Optional[Nutrients]:
+        """Compute the nutrition of a single recipe."""
+        return self.analyze([recipe])[0]
+
+    def enrich_book(self, book, only_missing: bool = True) -> int:
+        """
+        Fill in calories for the recipes in a RecipeBook.
+
+        Returns the number of recipes whose calories were updated. Raises
+        VersionConflictError if a recipe is saved elsewhere meanwhile.
+        Updates find recipes by title, which reaches only the first of
+        several recipes sharing a title, so later ones are left alone.
+        """
+        book.refresh()
+        recipes = [
+            recipe for recipe in book.get_all_recipes()
+            if (not only_missing or recipe.calories is None)
+            and book.get_recipe(recipe.title) is recipe
+        ]
+        updates = []
+        for recipe, nutrients in zip(recipes, self.analyze(recipes)):
+            if nutrients is None:
+                continue
+            calories = round(nutrients.calories, 1)
+            if calories == recipe.calories:
+                continue
+            updates.append((recipe.title, Recipe(
+                title=recipe.title,
+                ingredients=list(recipe.ingredients),
+                instructions=recipe.instructions,
+                calories=calories,
+                version=recipe.version
+            )))
+        return sum(book.update_recipes(updates, check_versions=True))
@@ -0,0 +1,135 @@
+"""
+Local stand-in for a nutrition HTTP API, for development and tests.
+
+Speaks the protocol used by the enrichment job:
+
+    POST /nutrition
+    {"items": [{"name": "flour", "amount": 236.6, "unit": "ml"}, ...]}
+
+    200 OK
+    {"items": [{"calories": 456.4, "protein": 12.9, "fat": 1.3, "carbs": 95.7}, null, ...]}
+
+Answers come from LocalNutritionProvider; unknown ingredients are null.
+
+Run it with: python -m recipe_manager.nutrition_server --port 8080
+"""
+
+import argparse
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .nutrition import LocalNutritionProvider
+
+
+class NutritionRequestHandler(BaseHTTPRequestHandler):
+    """Handles batch nutrition lookups against the bundled table."""
+
+    protocol_version = "HTTP/1.1"  # Keep connections alive between requests
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        server.request_count += 1
+        if self.path != "/nutrition":
+            self._reply(404, {"error": "not found"})
+            return
+        if server.failure_rate and server.random.random() < server.failure_rate:
+            self._reply(503, {"error": "try again"}, {"Retry-After": "0"})
+            return
+        try:
+            items = json.loads(body)["items"]
+            keys = [(item["name"], item["amount"], item["unit"]) for item in items]
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {"error": "bad request"})
+            return
+        answers = server.provider.lookup_batch(keys)
+        self._reply(200, {
+            "items": [
+                {
+                    "calories": nutrients.calories,
+                    "protein": nutrients.protein,
+                    "fat": nutrients.fat,
+                    "carbs": nutrients.carbs
+                } if nutrients is not None else None
+                for nutrients in (answers[key] for key in keys)
+            ]
+        })
+
+    def _reply(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class NutritionServer(ThreadingHTTPServer):
+    """
+    HTTP server answering nutrition lookups from the bundled table.
+
+    ``failure_rate`` makes that fraction of requests fail with 503, to
+    exercise client retries.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        failure_rate: float = 0.0,
+        quiet: bool = True
+    ):
+        super().__init__((host, port), NutritionRequestHandler)
+        self.provider = LocalNutritionProvider()
+        self.failure_rate = failure_rate
+        self.quiet = quiet
+        self.random = random.Random()
+        self.request_count = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'NutritionServer':
+        """Serve requests on a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local nutrition API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = NutritionServer(args.host, args.port, args.failure_rate, quiet=False)
+    print(f"Serving nutrition lookups on {server.url}/nutrition")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
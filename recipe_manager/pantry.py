@@ -0,0 +1,159 @@
+"""
+Recipe suggestions from the ingredients on hand.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from .indexes import IngredientIndex
+from .models import Recipe
+
+
+def normalize_item(name: str) -> str:
+    """Lowercase a pantry item or ingredient name and collapse its whitespace."""
+    return " ".join(name.lower().split())
+
+
+@dataclass
+class Suggestion:
+    """A recipe ranked against the pantry."""
+    recipe: Recipe
+    covered: int  # Distinct ingredients the pantry has
+    missing: List[str]  # Ingredient names still to buy
+    missing_cost: float
+
+
+class PantryMatcher:
+    """
+    Ranks a RecipeBook's recipes by how much of each the pantry covers.
+
+    A pantry item covers every ingredient whose name contains it, the
+    same matching filter_by_ingredients uses, so "garlic" covers "garlic
+    cloves". Each recipe keeps a running count and cost of its covered
+    ingredients, updated through the ingredient index's posting lists as
+    items are added or removed, so a suggestion only looks at recipes
+    sharing at least one ingredient with the pantry.
+
+    ``weights`` gives the cost of missing an ingredient, by (case
+    insensitive) name; others cost ``default_weight``. The matcher
+    rebuilds itself when the book changes.
+
+    Example:
+        matcher = PantryMatcher(book, ["eggs", "flour", "milk"])
+        for suggestion in matcher.suggest(5):
+            print(suggestion.recipe.title, suggestion.missing)
+    """
+
+    def __init__(
+        self,
+        book,
+        pantry: Iterable[str] = (),
+        weights: Optional[Dict[str, float]] = None,
+        default_weight: float = 1.0
+    ):
+        self.book = book
+        self.weights = {name.lower(): cost for name, cost in (weights or {}).items()}
+        self.default_weight = default_weight
+        self._pantry: Set[str] = set()
+        self._revision = None  # Book revision the index was built from
+        for item in pantry:
+            self.add_item(item)
+
+    @property
+    def pantry(self) -> FrozenSet[str]:
+        """The normalized pantry items."""
+        return frozenset(self._pantry)
+
+    def _weight(self, name: str) -> float:
+        return self.weights.get(name, self.default_weight)
+
+    def _ensure_current(self) -> None:
+        """Rebuild the index and coverage counts if the book has changed."""
+        revision = self.book.revision
+        if revision == self._revision:
+            return
+        self._recipes = self.book.get_all_recipes()
+        self._index = IngredientIndex()
+        self._names: List[FrozenSet[str]] = []
+        self._total_cost: List[float] = []
+        for position, recipe in enumerate(self._recipes):
+            self._index.add(position, recipe)
+            names = frozenset(ing.name.lower() for ing in recipe.ingredients)
+            self._names.append(names)
+            self._total_cost.append(sum(self._weight(name) for name in names))
+        self._name_refs: Dict[str, int] = {}  # Covered name -> pantry items covering it
+        self._covered: Dict[int, int] = {}  # Position -> covered ingredient count
+        self._covered_cost: Dict[int, float] = {}
+        for item in self._pantry:
+            self._cover(item, 1)
+        self._revision = revision
+
+    def _cover(self, item: str, delta: int) -> None:
+        """Add (delta=1) or withdraw (delta=-1) a pantry item's coverage."""
+        for name in self._index.names_matching(item):
+            refs = self._name_refs.get(name, 0) + delta
+            if refs:
+                self._name_refs[name] = refs
+            else:
+                del self._name_refs[name]
+            if refs != (1 if delta > 0 else 0):
+                continue  # Another pantry item already covers this name
+            weight = self._weight(name) * delta
+            for position in self._index.recipes_with_name(name):
+                count = self._covered.get(position, 0) + delta
+                if count:
+                    self._covered[position] = count
+                    self._covered_cost[position] = self._covered_cost.get(position, 0.0) + weight
+                else:
+                    del self._covered[position]
+                    del self._covered_cost[position]
+
+    def add_item(self, item: str) -> None:
+        """Put an item in the pantry."""
+        item = normalize_item(item)
+        if not item or item in self._pantry:
+            return
+        self._pantry.add(item)
+        if self._revision is not None:
+            self._cover(item, 1)
+
+    def remove_item(self, item: str) -> None:
+        """Take an item out of the pantry."""
+        item = normalize_item(item)
+        if item not in self._pantry:
+            return
+        self._pantry.discard(item)
+        if self._revision is not None:
+            self._cover(item, -1)
+
+    def suggest(self, limit: int = 10, max_missing: Optional[int] = None) -> List[Suggestion]:
+        """
+        Return the best ``limit`` recipes, ordered by missing cost, then
+        number of missing ingredients, then book order.
+
+        Recipes sharing no ingredient with the pantry are never suggested.
+        ``max_missing`` drops recipes needing more than that many items.
+        """
+        self._ensure_current()
+        names = self._names
+        candidates = (
+            (
+                self._total_cost[position] - cost,
+                len(names[position]) - self._covered[position],
+                position
+            )
+            for position, cost in self._covered_cost.items()
+        )
+        if max_missing is not None:
+            candidates = (entry for entry in candidates if entry[1] <= max_missing)
+        suggestions = []
+        for missing_cost, _, position in heapq.nsmallest(limit, candidates):
+            missing = sorted(name for name in names[position] if name not in self._name_refs)
+            suggestions.append(Suggestion(
+                recipe=self._recipes[position],
+                covered=self._covered[position],
+                missing=missing,
+                missing_cost=round(missing_cost, 6)
+            ))
+        return suggestions
@@ -0,0 +1,277 @@
+"""
+Parsing of free-form ingredient amounts into structured quantities.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+class Dimension(Enum):
+    """What a unit measures."""
+    VOLUME = "volume"
+    MASS = "mass"
+    COUNT = "count"
+
+
+# Canonical unit -> (dimension, size in the dimension's base unit).
+# Volume is measured in ml, mass in g; count units are their own base.
+UNITS: Dict[str, Tuple[Dimension, float]] = {
+    "pinch": (Dimension.VOLUME, 0.308),
+    "dash": (Dimension.VOLUME, 0.616),
+    "tsp": (Dimension.VOLUME, 4.92892),
+    "tbsp": (Dimension.VOLUME, 14.7868),
+    "fl oz": (Dimension.VOLUME, 29.5735),
+    "cup": (Dimension.VOLUME, 236.588),
+    "ml": (Dimension.VOLUME, 1.0),
+    "l": (Dimension.VOLUME, 1000.0),
+    "mg": (Dimension.MASS, 0.001),
+    "g": (Dimension.MASS, 1.0),
+    "kg": (Dimension.MASS, 1000.0),
+    "oz": (Dimension.MASS, 28.3495),
+    "lb": (Dimension.MASS, 453.592),
+    "": (Dimension.COUNT, 1.0),
+    "piece": (Dimension.COUNT, 1.0),
+    "clove": (Dimension.COUNT, 1.0),
+    "slice": (Dimension.COUNT, 1.0),
+    "can": (Dimension.COUNT, 1.0),
+    "package": (Dimension.COUNT, 1.0),
+}
+
+# Spellings accepted for each canonical unit, besides the unit itself
+UNIT_ALIASES: Dict[str, str] = {
+    "pinches": "pinch",
+    "dashes": "dash",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsps": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsps": "tbsp", "tbs": "tbsp",
+    "fluid ounce": "fl oz", "fluid ounces": "fl oz",
+    "cups": "cup", "c": "cup",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "milligram": "mg", "milligrams": "mg",
+    "gram": "g", "grams": "g", "gr": "g",
+    "kilogram": "kg", "kilograms": "kg", "kgs": "kg",
+    "ounce": "oz", "ounces": "oz",
+    "pound": "lb", "pounds": "lb", "lbs": "lb",
+    "pieces": "piece", "pcs": "piece",
+    "cloves": "clove",
+    "slices": "slice",
+    "cans": "can",
+    "packages": "package", "pkg": "package",
+}
+
+# Units measured in metric; amounts in these are shown in metric units
+METRIC_UNITS = frozenset({"ml", "l", "mg", "g", "kg"})
+
+# Units an amount is shown in, largest first, each with the smallest value
+# worth showing in it and the denominators a value must land on to be shown
+# in it (None if any value will do):
+# (dimension, metric) -> [(unit, minimum value, denominators)]
+DISPLAY_UNITS: Dict[Tuple[Dimension, bool], List[Tuple[str, float, Optional[Tuple[int, ...]]]]] = {
+    (Dimension.VOLUME, False): [
+        ("cup", 0.25, (2, 3, 4)), ("tbsp", 1.0, None), ("tsp", 0.125, None), ("pinch", 0.0, None)
+    ],
+    (Dimension.VOLUME, True): [("l", 1.0, None), ("ml", 0.0, None)],
+    (Dimension.MASS, False): [("lb", 1.0, (2, 4)), ("oz", 0.0, None)],
+    (Dimension.MASS, True): [("kg", 1.0, None), ("g", 0.0, None)],
+}
+
+# Values from which a unit is used even off its denominators, e.g. 6.31 cups
+LARGE_VALUE = 4.0
+
+UNIT_PLURALS = {
+    "cup": "cups", "pinch": "pinches", "dash": "dashes", "piece": "pieces",
+    "clove": "cloves", "slice": "slices", "can": "cans", "package": "packages",
+}
+
+# Fractions amounts are rounded to for display, and how close they must be
+FRACTION_DENOMINATORS = (2, 3, 4, 8)
+FRACTION_TOLERANCE = 0.02
+
+UNICODE_FRACTIONS = {
+    "½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4",
+    "⅛": "1/8", "⅜": "3/8", "⅝": "5/8", "⅞": "7/8",
+}
+
+_AMOUNT_PATTERN = re.compile(
+    r"""^\s*
+    (?:
+        (?P<whole>\d+)\s+(?P<num>\d+)\s*/\s*(?P<den>\d+)   # mixed number: 1 1/2
+      | (?P<fnum>\d+)\s*/\s*(?P<fden>\d+)                  # fraction: 1/2
+      | (?P<decimal>\d+(?:\.\d*)?|\.\d+)                   # 2, 1.5, .5
+    )?
+    \s*(?P<unit>[^\d\s].*?)?\.?\s*$""",
+    re.VERBOSE
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Quantity:
+    """A parsed amount: a value in a canonical unit of some dimension."""
+    value: float
+    unit: str
+    dimension: Dimension
+
+    @property
+    def base_value(self) -> float:
+        """The value in the dimension's base unit (ml, g, or count)."""
+        return self.value * UNITS[self.unit][1]
+
+
+def canonical_unit(unit: str) -> Optional[str]:
+    """Return the canonical spelling of a unit, or None if unknown."""
+    unit = " ".join(unit.lower().split()).rstrip(".")
+    if unit in UNITS:
+        return unit
+    return UNIT_ALIASES.get(unit)
+
+
+def _replace_unicode_fractions(text: str) -> str:
+    """Turn "1½ cups" into "1 1/2 cups" style text."""
+    for char, fraction in UNICODE_FRACTIONS.items():
+        if char in text:
+            text = text.replace(char, f" {fraction}")
+    return text
+
+
+@lru_cache(maxsize=4096)
+def parse_amount(amount: str) -> Optional[Quantity]:
+    """
+    Parse an amount string like "2 cups", "1 1/2 tbsp", "500g" or "pinch".
+
+    A unit without a number counts as one of that unit, and a bare number
+    is a count. Returns None if the string can't be understood. Results
+    are cached because the same few amount strings repeat across recipes.
+    """
+    match = _AMOUNT_PATTERN.match(_replace_unicode_fractions(amount))
+    if match is None:
+        return None
+    groups = match.groupdict()
+    if groups["whole"] is not None:
+        denominator = int(groups["den"])
+        if denominator == 0:
+            return None
+        value = int(groups["whole"]) + int(groups["num"]) / denominator
+    elif groups["fnum"] is not None:
+        denominator = int(groups["fden"])
+        if denominator == 0:
+            return None
+        value = int(groups["fnum"]) / denominator
+    elif groups["decimal"] is not None:
+        value = float(groups["decimal"])
+    else:
+        value = None
+
+    unit = canonical_unit(groups["unit"] or "")
+    if unit is None or (value is None and not unit):
+        return None
+    return Quantity(
+        value=1.0 if value is None else value,
+        unit=unit,
+        dimension=UNITS[unit][0]
+    )
+
+
+def split_ingredient_text(text: str) -> Tuple[str, str]:
+    """
+    Split text like "2 cups olive oil" into ("2 cups", "olive oil").
+
+    Takes the longest leading run of words that parses as an amount while
+    leaving at least one word for the name. Text without a recognizable
+    amount is treated as a name with amount "1".
+    """
+    words = text.split()
+    for length in range(min(3, len(words) - 1), 0, -1):
+        amount = " ".join(words[:length])
+        if parse_amount(amount) is not None:
+            return amount, " ".join(words[length:])
+    return "1", " ".join(words)
+
+
+def format_number(value: float) -> str:
+    """Render a number with at most two decimals: 2.0 -> "2", 1.0625 -> "1.06"."""
+    return f"{round(value, 2):g}"
+
+
+def format_fraction(value: float) -> str:
+    """
+    Render a number the way recipes write it: 1.5 -> "1 1/2", 0.333 ->
+    "1/3". Values that aren't close to a half, third, quarter or eighth
+    fall back to decimals.
+    """
+    whole = int(value)
+    fraction = value - whole
+    best = min(FRACTION_DENOMINATORS, key=lambda d: abs(fraction - round(fraction * d) / d))
+    numerator = round(fraction * best)
+    if abs(fraction - numerator / best) > FRACTION_TOLERANCE or not (whole or numerator):
+        return format_number(value)
+    if numerator == best:
+        whole, numerator = whole + 1, 0
+    if not numerator:
+        return str(whole)
+    divisor = math.gcd(numerator, best)
+    text = f"{numerator // divisor}/{best // divisor}"
+    return f"{whole} {text}" if whole else text
+
+
+def _lands_on(value: float, denominators: Tuple[int, ...]) -> bool:
+    """Check whether a value is close to a multiple of 1/d for one of the denominators."""
+    return any(
+        abs(value - round(value * denominator) / denominator) <= FRACTION_TOLERANCE
+        for denominator in denominators
+    )
+
+
+def format_quantity(quantity: Quantity, metric: Optional[bool] = None) -> str:
+    """
+    Render a quantity in the most readable unit of its dimension.
+
+    Volumes and masses are converted to the largest unit that keeps the
+    number reasonable, so 48 tsp shows as "1 cup" and 1500 g as "1.5 kg".
+    Cups and pounds are only used for amounts a cook would measure in
+    them, like 1/3 cup or 1 1/4 lb, so 5 tbsp stays "5 tbsp" rather than
+    becoming "0.31 cup". ``metric`` picks the unit system; by default it
+    follows the quantity's own unit. Metric amounts use decimals and
+    others use fractions. Counts keep their unit.
+    """
+    if metric is None:
+        metric = quantity.unit in METRIC_UNITS
+    ladder = DISPLAY_UNITS.get((quantity.dimension, metric))
+    if ladder is None:
+        value, unit = quantity.value, quantity.unit
+    else:
+        base_value = quantity.base_value
+        for unit, minimum, denominators in ladder:
+            value = base_value / UNITS[unit][1]
+            if value < minimum - FRACTION_TOLERANCE:
+                continue
+            if denominators is None or value >= LARGE_VALUE or _lands_on(value, denominators):
+                break
+    text = format_number(value) if metric else format_fraction(value)
+    if not unit:
+        return text
+    if round(value, 2) > 1:
+        unit = UNIT_PLURALS.get(unit, unit)
+    return f"{text} {unit}"
+
+
+def check_factor(factor: float) -> None:
+    """Raise ValueError unless a scaling factor is a positive, finite number."""
+    if not 0 < factor < math.inf:
+        raise ValueError(f"Scaling factor must be positive, got {factor!r}")
+
+
+def scale_amount(amount: str, factor: float) -> str:
+    """
+    Multiply an amount string by a factor, e.g. ("3/4 cup", 2) -> "1 1/2
+    cups". Amounts that can't be parsed, like "to taste", are unchanged.
+    Raises ValueError unless the factor is positive.
+    """
+    check_factor(factor)
+    quantity = parse_amount(amount)
+    if quantity is None:
+        return amount
+    return format_quantity(Quantity(quantity.value * factor, quantity.unit, quantity.dimension))
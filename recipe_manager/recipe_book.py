@@ -2,11 +2,21 @@
 RecipeBook class for managing and organizing recipes.
 """
 
-from typing import List, Optional, Callable
+import threading
+from bisect import insort
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Callable, Tuple
 from enum import Enum
 
+from .columnar import RecipeColumns
+from .indexes import IngredientIndex, SortedView, TrigramIndex
 from .models import Recipe
-from .storage import RecipeStorage
+from .scaling import scale_recipes
+from .search import SearchIndex
+from .shopping import ShoppingItem, build_shopping_list
+from .similarity import MinHashIndex
+from .storage import Mutation, RecipeStorage, VersionConflictError
+from .transfer import read_ndjson, write_ndjson
 
 
 class SortBy(Enum):
@@ -16,62 +26,480 @@ class SortBy(Enum):
     CALORIES = "calories"
 
 
+# Sort keys for each SortBy option; calories put recipes without a value last
+SORT_KEYS: Dict[SortBy, Callable[[Recipe], object]] = {
+    SortBy.ALPHABETICAL: lambda r: r.title.lower(),
+    SortBy.INGREDIENT_COUNT: lambda r: r.get_ingredient_count(),
+    SortBy.CALORIES: lambda r: (r.calories is None, r.calories or 0),
+}
+
+
 class RecipeBook:
-    """Main class for managing a collection of recipes."""
+    """
+    Main class for managing a collection of recipes.
+    
+    A book may be shared between threads, e.g. a GUI searching on a
+    worker thread; every public method holds the book's lock.
+    """
     
-    def __init__(self, storage: Optional[RecipeStorage] = None):
-        """Initialize RecipeBook with optional storage."""
+    def __init__(
+        self,
+        storage: Optional[RecipeStorage] = None,
+        autoload: bool = True,
+        similarity_bands: int = 16,
+        similarity_rows: int = 3
+    ):
+        """
+        Initialize RecipeBook with optional storage.
+        
+        With ``autoload=False`` the book starts empty and the caller runs
+        load(), typically on a background thread. ``similarity_bands`` and
+        ``similarity_rows`` configure the MinHashIndex behind
+        similar_recipes().
+        """
         self.storage = storage or RecipeStorage()
-        self._recipes: List[Recipe] = []
-        self._load_recipes()
+        self.similarity_bands = similarity_bands
+        self.similarity_rows = similarity_rows
+        self._recipes: Dict[int, Recipe] = {}  # Recipe id -> recipe, in book order
+        self._indexed: Dict[int, Recipe] = {}  # Recipe id -> copy the indexes were built from
+        self._titles: Dict[str, List[int]] = {}  # Lowercase title -> recipe ids
+        self._ingredients = IngredientIndex()
+        self._title_trigrams = TrigramIndex()
+        self._sorted_views: Dict[SortBy, SortedView] = {}  # Built on first use
+        self._search_index: Optional[SearchIndex] = None  # Built on first ranked search
+        self._columns: Optional[RecipeColumns] = None  # Built on first use, per revision
+        self._similarity_index: Optional[MinHashIndex] = None  # Built on first use
+        self._next_id = 0
+        self._revision = 0  # Bumped on every in-memory change
+        self._generation = None  # Storage generation our in-memory state reflects
+        self._pending: Optional[List[Mutation]] = None  # Buffered in a transaction
+        self._lock = threading.RLock()
+        self._loading = False  # True while load() runs
+        # Waiting on the condition releases the lock, however deeply held
+        self._load_finished = threading.Condition(self._lock)
+        if autoload:
+            self.load()
+    
+    def load(
+        self,
+        progress: Optional[Callable[[int, int], None]] = None,
+        chunk_size: int = 500
+    ) -> None:
+        """
+        Load all recipes from storage, replacing the book's contents.
+        
+        Recipes are indexed in chunks and the lock is released between
+        chunks, so other threads can read the partly loaded book while
+        this runs on a background thread. ``progress(loaded, total)`` is
+        called after each chunk, on the loading thread. Transactions wait
+        until loading has finished.
+        """
+        with self._lock:
+            # Holding the lock means no transaction is in progress
+            self._wait_for_load()
+            self._loading = True
+        try:
+            with self._lock:
+                self._generation = self.storage.get_generation()
+                self._recipes = {}
+                self._indexed = {}
+                self._titles = {}
+                self._ingredients = IngredientIndex()
+                self._title_trigrams = TrigramIndex()
+                self._sorted_views = {}
+                self._search_index = None
+                self._similarity_index = None
+                self._next_id = 0
+                self._revision += 1
+            recipes = self.storage.get_all_recipes()
+            total = len(recipes)
+            for start in range(0, total, chunk_size):
+                with self._lock:
+                    for recipe in recipes[start:start + chunk_size]:
+                        self._insert(recipe)
+                if progress is not None:
+                    progress(min(start + chunk_size, total), total)
+        finally:
+            with self._lock:
+                self._loading = False
+                self._load_finished.notify_all()
+    
+    def is_loading(self) -> bool:
+        """Check whether a load() is in progress."""
+        return self._loading
+    
+    def _wait_for_load(self) -> None:
+        """Wait, with the lock held, until no load() is in progress."""
+        self._load_finished.wait_for(lambda: not self._loading)
+    
+    @property
+    def revision(self) -> int:
+        """
+        A counter that changes whenever the book's contents change, so
+        structures derived from the book can tell when they are stale.
+        """
+        return self._revision
+    
+    def _insert(self, recipe: Recipe) -> int:
+        """Add a recipe to the in-memory collection and indexes."""
+        recipe_id = self._next_id
+        self._next_id += 1
+        self._recipes[recipe_id] = recipe
+        self._index_recipe(recipe_id, recipe)
+        return recipe_id
+    
+    def _replace(self, recipe_id: int, recipe: Recipe) -> None:
+        """Swap the recipe stored under an id, keeping its position."""
+        self._unindex_recipe(recipe_id)
+        self._recipes[recipe_id] = recipe
+        self._index_recipe(recipe_id, recipe)
+    
+    def _remove(self, recipe_id: int) -> None:
+        """Drop a recipe from the in-memory collection and indexes."""
+        del self._recipes[recipe_id]
+        self._unindex_recipe(recipe_id)
+    
+    def _index_recipe(self, recipe_id: int, recipe: Recipe) -> None:
+        """
+        Add a recipe to the lookup indexes.
+        
+        The indexes are built from a private copy, since callers may edit
+        the recipes the book hands out; the copy is what gets unindexed.
+        """
+        self._revision += 1
+        recipe = self._indexed[recipe_id] = recipe.copy()
+        insort(self._titles.setdefault(recipe.title.lower(), []), recipe_id)
+        self._ingredients.add(recipe_id, recipe)
+        self._title_trigrams.add(recipe_id, recipe.title.lower())
+        for view in self._sorted_views.values():
+            view.add(recipe_id, recipe)
+        if self._search_index is not None:
+            self._search_index.add(recipe_id, recipe)
+        if self._similarity_index is not None:
+            self._similarity_index.add(recipe_id, recipe)
+    
+    def _unindex_recipe(self, recipe_id: int) -> None:
+        """Remove a recipe from the lookup indexes."""
+        self._revision += 1
+        recipe = self._indexed.pop(recipe_id)
+        key = recipe.title.lower()
+        ids = self._titles[key]
+        ids.remove(recipe_id)
+        if not ids:
+            del self._titles[key]
+        self._ingredients.remove(recipe_id, recipe)
+        self._title_trigrams.remove(recipe_id)
+        for view in self._sorted_views.values():
+            view.remove(recipe_id)
+        if self._search_index is not None:
+            self._search_index.remove(recipe_id, recipe)
+        if self._similarity_index is not None:
+            self._similarity_index.remove(recipe_id, recipe)
+    
+    def _sync_recipes(self) -> None:
+        """
+        Bring the in-memory book in line with storage, touching only the
+        recipes that differ so unchanged ones keep their index entries.
+        
+        Storage hands back our indexed copies for recipes whose title and
+        version we already hold, so those aren't even rebuilt. A copy that
+        lands under a different id than its own is copied again, so callers
+        never get hold of the index's objects.
+        """
+        self._generation = self.storage.get_generation()
+        cached: Dict[Tuple[str, int], Recipe] = {}
+        ambiguous = set()  # Duplicate titles at the same version
+        for recipe in self._indexed.values():
+            key = (recipe.title, recipe.version)
+            if key in cached:
+                ambiguous.add(key)
+            cached[key] = recipe
+        for key in ambiguous:
+            del cached[key]
+        # Object identity of each indexed copy -> the id it was made for
+        owners = {id(recipe): recipe_id for recipe_id, recipe in self._indexed.items()}
+        
+        unmatched = {key: list(ids) for key, ids in self._titles.items()}
+        for recipe in self.storage.get_all_recipes(cached):
+            ids = unmatched.get(recipe.title.lower())
+            if not ids:
+                if id(recipe) in owners:
+                    recipe = recipe.copy()
+                self._insert(recipe)
+                continue
+            recipe_id = ids.pop(0)
+            current = self._indexed[recipe_id]
+            if current is not recipe and current != recipe:
+                if owners.get(id(recipe), recipe_id) != recipe_id:
+                    recipe = recipe.copy()
+                self._replace(recipe_id, recipe)
+        for ids in unmatched.values():
+            for recipe_id in ids:
+                self._remove(recipe_id)
+    
+    def _resync_after_error(self) -> None:
+        """
+        Resync from storage after a failed transaction without masking the
+        original error. If the resync fails too, the book is marked stale
+        so the next refresh() or transaction tries again.
+        """
+        try:
+            self._sync_recipes()
+        except Exception:
+            self._generation = None
+    
+    def _storage_changed(self) -> bool:
+        """Check whether storage was modified behind our back."""
+        return self.storage.get_generation() != self._generation
+    
+    def refresh(self) -> bool:
+        """
+        Pick up changes made to storage by other processes.
+        
+        Only new, changed and removed recipes are re-indexed. Returns True
+        if storage had changed.
+        """
+        with self._lock:
+            self._wait_for_load()
+            if not self._storage_changed():
+                return False
+            self._sync_recipes()
+            return True
+    
+    @contextmanager
+    def transaction(self) -> Iterator['RecipeBook']:
+        """
+        Group several changes into one storage write.
+        
+        Changes made inside the block show up in the book immediately but
+        are buffered and written to storage together when the block exits.
+        If the block raises, the buffered changes are dropped and the book
+        is resynced from storage. Nested transactions join the outer one.
+        Other threads wait until the transaction has finished, and the
+        transaction waits for a load in progress.
+        
+        Example:
+            with book.transaction():
+                book.add_recipe(recipe)
+                book.delete_recipe("Old Recipe")
+        """
+        with self._lock:
+            if self._pending is not None:
+                yield self
+                return
+            self._wait_for_load()
+            self.refresh()
+            self._pending = []
+            try:
+                yield self
+            except BaseException:
+                self._pending = None
+                self._resync_after_error()
+                raise
+            pending, self._pending = self._pending, None
+            if not pending:
+                return
+            try:
+                batch = self.storage.apply_batch(pending)
+            except BaseException:
+                self._resync_after_error()
+                raise
+            if all(batch.results) and batch.generation_before == self._generation:
+                self._generation = batch.generation
+            else:
+                # Storage disagreed with our in-memory view, or someone else
+                # wrote since we last read it; resync from it
+                self._sync_recipes()
+    
+    def _apply_add(self, recipe: Recipe) -> None:
+        """
+        Add a recipe in memory and buffer the storage write.
+        
+        The book keeps a copy, so the caller's recipe is left untouched
+        if the transaction is rolled back.
+        """
+        recipe = recipe.copy()
+        recipe.version = 1  # What storage will assign
+        self._insert(recipe)
+        self._pending.append(Mutation("add", recipe.title, recipe))
     
-    def _load_recipes(self) -> None:
-        """Load recipes from storage."""
-        self._recipes = self.storage.get_all_recipes()
+    def _apply_update(
+        self,
+        old_title: str,
+        updated_recipe: Recipe,
+        expected_version: Optional[int] = None
+    ) -> bool:
+        """Update a recipe in memory, from a copy, and buffer the storage write."""
+        ids = self._titles.get(old_title.lower())
+        if not ids:
+            return False
+        version = self._recipes[ids[0]].version
+        if expected_version is not None and expected_version != version:
+            raise VersionConflictError(old_title, expected_version, version)
+        updated_recipe = updated_recipe.copy()
+        updated_recipe.version = version + 1
+        self._replace(ids[0], updated_recipe)
+        self._pending.append(
+            Mutation("update", old_title, updated_recipe, expected_version)
+        )
+        return True
+    
+    def _apply_delete(self, title: str) -> bool:
+        """Delete recipes in memory and buffer the storage write."""
+        ids = self._titles.get(title.lower())
+        if not ids:
+            return False
+        for recipe_id in list(ids):
+            self._remove(recipe_id)
+        self._pending.append(Mutation("delete", title))
+        return True
     
     def add_recipe(self, recipe: Recipe) -> None:
         """Add a new recipe to the book."""
-        self._recipes.append(recipe)
-        self.storage.add_recipe(recipe)
+        with self.transaction():
+            self._apply_add(recipe)
+    
+    def add_recipes(self, recipes: Iterable[Recipe]) -> int:
+        """Add many recipes with a single storage write. Returns the count added."""
+        count = 0
+        with self.transaction():
+            for recipe in recipes:
+                self._apply_add(recipe)
+                count += 1
+        return count
     
     def get_recipe(self, title: str) -> Optional[Recipe]:
         """Get a recipe by title."""
-        return self.storage.get_recipe_by_title(title)
+        with self._lock:
+            ids = self._titles.get(title.lower())
+            return self._recipes[ids[0]] if ids else None
+    
+    def has_recipe(self, title: str) -> bool:
+        """Check whether a recipe with the given title exists."""
+        with self._lock:
+            return title.lower() in self._titles
+    
+    def update_recipe(
+        self,
+        old_title: str,
+        updated_recipe: Recipe,
+        expected_version: Optional[int] = None
+    ) -> bool:
+        """
+        Update an existing recipe.
+        
+        Pass the ``version`` of the recipe the edit started from as
+        ``expected_version`` to raise VersionConflictError, instead of
+        overwriting, if someone else saved the recipe in the meantime.
+        """
+        with self.transaction():
+            return self._apply_update(old_title, updated_recipe, expected_version)
     
-    def update_recipe(self, old_title: str, updated_recipe: Recipe) -> bool:
-        """Update an existing recipe."""
-        success = self.storage.update_recipe(old_title, updated_recipe)
-        if success:
-            self._load_recipes()  # Reload to sync
-        return success
+    def update_recipes(
+        self,
+        updates: Iterable[Tuple[str, Recipe]],
+        check_versions: bool = False
+    ) -> List[bool]:
+        """
+        Apply many (old_title, updated_recipe) updates with a single storage
+        write. Returns whether each update found its recipe.
+        
+        With ``check_versions``, each updated recipe's own ``version`` is
+        the expected version, and any conflict aborts the whole batch with
+        VersionConflictError.
+        """
+        with self.transaction():
+            return [
+                self._apply_update(
+                    old_title,
+                    updated_recipe,
+                    updated_recipe.version if check_versions else None
+                )
+                for old_title, updated_recipe in updates
+            ]
     
     def delete_recipe(self, title: str) -> bool:
         """Delete a recipe by title."""
-        success = self.storage.delete_recipe(title)
-        if success:
-            self._load_recipes()  # Reload to sync
-        return success
+        with self.transaction():
+            return self._apply_delete(title)
+    
+    def delete_recipes(self, titles: Iterable[str]) -> List[bool]:
+        """Delete many recipes with a single storage write."""
+        with self.transaction():
+            return [self._apply_delete(title) for title in titles]
+    
+    def shopping_list(
+        self,
+        titles: Iterable[str],
+        multiplier: float = 1.0
+    ) -> List[ShoppingItem]:
+        """
+        Build one shopping list for the recipes with the given titles.
+        
+        Amounts of the same ingredient are added up across compatible
+        units and multiplied by ``multiplier``, e.g. 2 to cook everything
+        twice. A title given twice counts twice. Raises ValueError for a
+        title that isn't in the book or a multiplier that isn't positive.
+        """
+        return build_shopping_list(self._recipes_titled(titles), multiplier)
+    
+    def scale_many(self, titles: Iterable[str], factor: float) -> List[Recipe]:
+        """
+        Return scaled copies of the recipes with the given titles, as
+        Recipe.scale would, without changing the book. Raises ValueError
+        for a title that isn't in the book.
+        """
+        return scale_recipes(self._recipes_titled(titles), factor)
+    
+    def _recipes_titled(self, titles: Iterable[str]) -> List[Recipe]:
+        """Look up recipes by title, raising ValueError for unknown ones."""
+        with self._lock:
+            recipes = []
+            for title in titles:
+                ids = self._titles.get(title.lower())
+                if not ids:
+                    raise ValueError(f"No recipe titled {title!r}")
+                recipes.append(self._recipes[ids[0]])
+            return recipes
     
     def get_all_recipes(self) -> List[Recipe]:
         """Get all recipes."""
-        return self._recipes.copy()
+        with self._lock:
+            return list(self._recipes.values())
+    
+    def import_ndjson(self, path: str) -> int:
+        """
+        Stream recipes from a newline-delimited JSON file into the book.
+        
+        The whole import is one transaction. Returns the number of recipes added.
+        """
+        return self.add_recipes(read_ndjson(path))
+    
+    def export_ndjson(self, path: str) -> int:
+        """Stream all recipes to a newline-delimited JSON file. Returns the count."""
+        with self._lock:
+            return write_ndjson(self._recipes.values(), path)
+    
+    def columns(self) -> RecipeColumns:
+        """
+        Return a column-oriented snapshot of the book for analytics: title,
+        ingredient count and calorie columns plus a sparse recipe x
+        ingredient matrix. It is built on first use and rebuilt after the
+        book changes; a returned snapshot never changes.
+        """
+        with self._lock:
+            if self._columns is None or self._columns.revision != self._revision:
+                self._columns = RecipeColumns(self._recipes.values(), self._revision)
+            return self._columns
     
     def sort_recipes(self, sort_by: SortBy, reverse: bool = False) -> List[Recipe]:
         """Sort recipes by the specified criteria."""
-        recipes = self._recipes.copy()
-        
-        if sort_by == SortBy.ALPHABETICAL:
-            recipes.sort(key=lambda r: r.title.lower(), reverse=reverse)
-        elif sort_by == SortBy.INGREDIENT_COUNT:
-            recipes.sort(key=lambda r: r.get_ingredient_count(), reverse=reverse)
-        elif sort_by == SortBy.CALORIES:
-            # Sort by calories, putting None values at the end
-            recipes.sort(
-                key=lambda r: (r.calories is None, r.calories or 0),
-                reverse=reverse
-            )
-        
-        return recipes
+        with self._lock:
+            view = self._sorted_views.get(sort_by)
+            if view is None:
+                view = SortedView(SORT_KEYS[sort_by], self._indexed)
+                self._sorted_views[sort_by] = view
+            return [self._recipes[recipe_id] for recipe_id in view.ids(reverse)]
     
     def filter_by_ingredients(
         self,
@@ -91,45 +519,75 @@ class RecipeBook:
         included = included or []
         excluded = excluded or []
         
-        filtered = []
-        for recipe in self._recipes:
-            ingredient_names = [
-                ing.name.lower() for ing in recipe.ingredients
-            ]
-            
-            # Check if all included ingredients are present
-            has_all_included = all(
-                any(inc.lower() in name for name in ingredient_names)
-                for inc in included
+        with self._lock:
+            # Resolve each term to a posting set; intersect smallest first
+            excluded_ids = set().union(
+                *(self._ingredients.recipes_matching(exc) for exc in excluded)
             )
+            if not included:
+                return [
+                    recipe for recipe_id, recipe in self._recipes.items()
+                    if recipe_id not in excluded_ids
+                ]
             
-            # Check if none of the excluded ingredients are present
-            has_no_excluded = all(
-                not any(exc.lower() in name for name in ingredient_names)
-                for exc in excluded
+            postings = sorted(
+                (self._ingredients.recipes_matching(inc) for inc in included),
+                key=len
             )
+            matching_ids = postings[0].intersection(*postings[1:])
+            matching_ids -= excluded_ids
             
-            if has_all_included and has_no_excluded:
-                filtered.append(recipe)
-        
-        return filtered
+            # Ids grow with insertion, so sorting them restores book order
+            return [self._recipes[recipe_id] for recipe_id in sorted(matching_ids)]
     
     def search_recipes(self, query: str) -> List[Recipe]:
         """Search recipes by title or ingredient name."""
         query_lower = query.lower()
-        results = []
+        with self._lock:
+            matching_ids = self._title_trigrams.search(query_lower)
+            matching_ids |= self._ingredients.recipes_matching(query_lower)
+            return [self._recipes[recipe_id] for recipe_id in sorted(matching_ids)]
+    
+    def search_ranked(self, query: str, limit: Optional[int] = 20) -> List[Recipe]:
+        """
+        Full-text search over titles, ingredients and instructions.
         
-        for recipe in self._recipes:
-            # Search in title
-            if query_lower in recipe.title.lower():
-                results.append(recipe)
-                continue
-            
-            # Search in ingredients
-            for ingredient in recipe.ingredients:
-                if query_lower in ingredient.name.lower():
-                    results.append(recipe)
-                    break
+        Returns up to ``limit`` recipes, or every match if ``limit`` is
+        None, best match first, scored with BM25. Words are matched whole
+        after dropping plural endings, so "clove" finds "cloves". The index
+        is built on first use and then kept up to date as recipes change.
+        """
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex()
+                for recipe_id, recipe in self._indexed.items():
+                    self._search_index.add(recipe_id, recipe)
+            return [
+                self._recipes[recipe_id]
+                for recipe_id, _ in self._search_index.search(query, limit)
+            ]
+    
+    def similar_recipes(self, title: str, k: int = 5) -> List[Recipe]:
+        """
+        Return up to ``k`` recipes whose ingredients most resemble those
+        of the recipe with the given title, most similar first.
         
-        return results
-
+        Similarity is estimated with MinHash and candidates come from an
+        LSH index, so this doesn't compare against every recipe and may
+        miss weak matches. The index is built on first use and then kept
+        up to date as recipes change.
+        """
+        with self._lock:
+            ids = self._titles.get(title.lower())
+            if not ids:
+                return []
+            if self._similarity_index is None:
+                self._similarity_index = MinHashIndex(
+                    self.similarity_bands, self.similarity_rows
+                )
+                for recipe_id, recipe in self._indexed.items():
+                    self._similarity_index.add(recipe_id, recipe)
+            return [
+                self._recipes[recipe_id]
+                for recipe_id, _ in self._similarity_index.similar(ids[0], k)
+            ]
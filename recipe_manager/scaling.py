@@ -0,0 +1,57 @@
+"""
+Bulk scaling of recipe amounts.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+from .models import Ingredient, Recipe, scale_calories
+from .quantities import Dimension, Quantity, check_factor, format_quantity, parse_amount
+
+
+def scale_recipes(recipes: Iterable[Recipe], factor: float) -> List[Recipe]:
+    """
+    Scale many recipes by the same factor, like Recipe.scale on each.
+
+    The distinct amount strings across all recipes are parsed once into
+    columns (an ``array`` of values beside their units), the value column
+    is multiplied in a single pass, and each scaled amount is rendered
+    once, so a catering job over thousands of recipes costs about as much
+    as its vocabulary of amounts rather than its ingredient count.
+    Raises ValueError unless the factor is positive.
+    """
+    check_factor(factor)
+    recipes = list(recipes)
+    columns: Dict[str, int] = {}  # Amount string -> row, or -1 if unparseable
+    values = array("d")
+    units: List[Tuple[str, Dimension]] = []
+    for recipe in recipes:
+        for ingredient in recipe.ingredients:
+            amount = ingredient.amount
+            if amount in columns:
+                continue
+            quantity = parse_amount(amount)
+            if quantity is None:
+                columns[amount] = -1
+                continue
+            columns[amount] = len(values)
+            values.append(quantity.value)
+            units.append((quantity.unit, quantity.dimension))
+
+    scaled = array("d", [value * factor for value in values])
+    rendered = {
+        amount: amount if row < 0 else format_quantity(Quantity(scaled[row], *units[row]))
+        for amount, row in columns.items()
+    }
+    return [
+        Recipe(
+            title=recipe.title,
+            ingredients=[
+                Ingredient(ing.name, rendered[ing.amount]) for ing in recipe.ingredients
+            ],
+            instructions=recipe.instructions,
+            calories=scale_calories(recipe.calories, factor),
+            version=recipe.version
+        )
+        for recipe in recipes
+    ]
@@ -0,0 +1,166 @@
+"""
+Ranked full-text search over recipes, scored with BM25F.
+"""
+
+import heapq
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .models import Recipe
+
+# Searchable fields, in the order their term frequencies are stored
+FIELDS = ("title", "ingredients", "instructions")
+
+# How much a match in each field counts relative to the instructions
+FIELD_BOOSTS: Dict[str, float] = {
+    "title": 3.0,
+    "ingredients": 2.0,
+    "instructions": 1.0,
+}
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "as", "at", "by", "for", "from", "in", "into", "is",
+    "it", "of", "on", "or", "the", "then", "to", "until", "with",
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def stem(token: str) -> str:
+    """
+    Reduce an English plural to its singular form.
+
+    Handles the endings that show up in ingredient names: "cloves" ->
+    "clove", "berries" -> "berry", "tomatoes" -> "tomato", "dishes" ->
+    "dish". Short words and words like "hummus" are left alone.
+    """
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith(("sses", "ches", "shes", "xes", "zes", "oes")):
+        return token[:-2]
+    if token.endswith(("ss", "us", "is")):
+        return token
+    return token[:-1]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase, stemmed terms, dropping stopwords."""
+    return [
+        stem(token)
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def recipe_fields(recipe: Recipe) -> Tuple[List[str], ...]:
+    """Tokenize a recipe's title, ingredient names and instructions."""
+    return (
+        tokenize(recipe.title),
+        tokenize(" ".join(ingredient.name for ingredient in recipe.ingredients)),
+        tokenize(recipe.instructions),
+    )
+
+
+class SearchIndex:
+    """
+    Inverted index over recipe titles, ingredients and instructions.
+
+    Each term maps to the recipes containing it along with the term's
+    frequency in every field. Queries are scored with BM25F: field
+    frequencies are length-normalized, weighted by ``boosts`` and summed
+    before BM25's saturation is applied, so a word in the title counts
+    more than the same word in the instructions.
+
+    Only recipes containing a query term are scored, and the best
+    ``limit`` are picked with a heap rather than by sorting them all.
+    Recipes can be added and removed at any time.
+    """
+
+    def __init__(
+        self,
+        boosts: Optional[Dict[str, float]] = None,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        boosts = {**FIELD_BOOSTS, **(boosts or {})}
+        self.boosts = tuple(boosts[field] for field in FIELDS)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, Tuple[int, ...]]] = {}
+        self._lengths: Dict[int, Tuple[int, ...]] = {}  # Recipe id -> field lengths
+        self._total_lengths = [0] * len(FIELDS)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, recipe_id: int, recipe: Recipe) -> None:
+        """Index a recipe under its id."""
+        fields = recipe_fields(recipe)
+        frequencies: Dict[str, List[int]] = {}
+        for field, terms in enumerate(fields):
+            for term in terms:
+                counts = frequencies.get(term)
+                if counts is None:
+                    counts = frequencies[term] = [0] * len(FIELDS)
+                counts[field] += 1
+        for term, counts in frequencies.items():
+            self._postings.setdefault(term, {})[recipe_id] = tuple(counts)
+        lengths = tuple(len(terms) for terms in fields)
+        self._lengths[recipe_id] = lengths
+        for field, length in enumerate(lengths):
+            self._total_lengths[field] += length
+
+    def remove(self, recipe_id: int, recipe: Recipe) -> None:
+        """Remove a recipe previously indexed under its id."""
+        lengths = self._lengths.pop(recipe_id, None)
+        if lengths is None:
+            return
+        for field, length in enumerate(lengths):
+            self._total_lengths[field] -= length
+        for term in set(term for terms in recipe_fields(recipe) for term in terms):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(recipe_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Tuple[int, float]]:
+        """
+        Return up to ``limit`` (recipe id, score) pairs, best first, or
+        every match if ``limit`` is None.
+
+        Equal scores are ordered by recipe id, i.e. book order.
+        """
+        count = len(self._lengths)
+        terms = set(tokenize(query))
+        if not count or not terms or (limit is not None and limit <= 0):
+            return []
+
+        k1, b = self.k1, self.b
+        # Per-field length normalization: 1 - b + b * length / average
+        averages = [total / count or 1.0 for total in self._total_lengths]
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for recipe_id, counts in postings.items():
+                lengths = self._lengths[recipe_id]
+                weighted = 0.0
+                for field, frequency in enumerate(counts):
+                    if frequency:
+                        norm = 1 - b + b * lengths[field] / averages[field]
+                        weighted += self.boosts[field] * frequency / norm
+                score = idf * weighted * (k1 + 1) / (k1 + weighted)
+                scores[recipe_id] = scores.get(recipe_id, 0.0) + score
+
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return heapq.nlargest(
+            limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
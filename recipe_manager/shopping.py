@@ -0,0 +1,117 @@
+"""
+Consolidated shopping lists for a set of recipes.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Recipe
+from .quantities import (
+    METRIC_UNITS, UNITS, Dimension, Quantity, check_factor, format_quantity, parse_amount
+)
+from .search import stem
+
+# (dimension, unit totals are kept in, size of the amount's unit in it, metric)
+Conversion = Tuple[Dimension, str, float, bool]
+
+# Unit totals of each dimension are kept in; counts keep their own unit
+BASE_UNITS = {Dimension.VOLUME: "ml", Dimension.MASS: "g"}
+
+
+@dataclass
+class ShoppingItem:
+    """One line of a shopping list."""
+    name: str
+    amount: str  # Total, rendered in a readable unit; unparsed amounts as written
+    recipes: int  # How many of the recipes need it
+
+
+def item_key(name: str) -> str:
+    """Normalize an ingredient name so "Egg" and "eggs" share a line."""
+    words = name.lower().split()
+    if words:
+        words[-1] = stem(words[-1])
+    return " ".join(words)
+
+
+def _conversion(amount: str) -> Optional[Conversion]:
+    """Work out how to add an amount string to a running total."""
+    quantity = parse_amount(amount)
+    if quantity is None:
+        return None
+    base_unit = BASE_UNITS.get(quantity.dimension, quantity.unit)
+    return (
+        quantity.dimension,
+        base_unit,
+        quantity.value * UNITS[quantity.unit][1] / UNITS[base_unit][1],
+        quantity.unit in METRIC_UNITS
+    )
+
+
+def build_shopping_list(recipes: Iterable[Recipe], multiplier: float = 1.0) -> List[ShoppingItem]:
+    """
+    Merge the ingredients of many recipes into one list, sorted by name.
+
+    Amounts of the same ingredient are added up in a single pass over a
+    hash table keyed by normalized name and dimension, so cups and
+    tablespoons of milk combine, as do grams and pounds of flour. Each
+    distinct amount string and name is parsed only once. Totals are
+    multiplied by ``multiplier`` and shown in metric units only if every
+    amount that went into them was metric. Amounts that can't be parsed,
+    like "to taste", are listed as written. Raises ValueError unless the
+    multiplier is positive.
+    """
+    check_factor(multiplier)
+    conversions: Dict[str, Optional[Conversion]] = {}
+    keys: Dict[str, str] = {}
+    # (name key, dimension, base unit) -> [name, total, metric, recipe ids]
+    totals: Dict[tuple, list] = {}
+    unparsed: Dict[str, list] = {}  # Name key -> [name, amounts, recipe ids]
+
+    for recipe_number, recipe in enumerate(recipes):
+        for ingredient in recipe.ingredients:
+            amount = ingredient.amount
+            if amount in conversions:
+                conversion = conversions[amount]
+            else:
+                conversion = conversions[amount] = _conversion(amount)
+            name = ingredient.name
+            key = keys.get(name)
+            if key is None:
+                key = keys[name] = item_key(name)
+
+            if conversion is None:
+                entry = unparsed.get(key)
+                if entry is None:
+                    entry = unparsed[key] = [name, {}, set()]
+                entry[1][amount.strip()] = None
+                entry[2].add(recipe_number)
+                continue
+            dimension, base_unit, size, metric = conversion
+            total_key = (key, dimension, base_unit)
+            entry = totals.get(total_key)
+            if entry is None:
+                totals[total_key] = [name, size, metric, {recipe_number}]
+            else:
+                entry[1] += size
+                entry[2] = entry[2] and metric
+                entry[3].add(recipe_number)
+
+    items = [
+        (key, ShoppingItem(
+            name=name,
+            amount=format_quantity(Quantity(total * multiplier, base_unit, dimension), metric),
+            recipes=len(recipe_numbers)
+        ))
+        for (key, dimension, base_unit), (name, total, metric, recipe_numbers) in totals.items()
+    ]
+    items.extend(
+        (key, ShoppingItem(
+            name=name,
+            amount=", ".join(amount for amount in amounts if amount),
+            recipes=len(recipe_numbers)
+        ))
+        for key, (name, amounts, recipe_numbers) in unparsed.items()
+    )
+    items.sort(key=lambda pair: pair[0])
+    return [item for _, item in items]
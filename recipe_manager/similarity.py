@@ -0,0 +1,139 @@
+"""
+Approximate similar-recipe lookup with MinHash and locality-sensitive hashing.
+"""
+
+import heapq
+import random
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .models import Recipe
+from .shopping import item_key
+
+# Mersenne prime used as the modulus of the MinHash hash functions
+_PRIME = (1 << 61) - 1
+
+Signature = Tuple[int, ...]
+
+
+class MinHashIndex:
+    """
+    Finds recipes with similar ingredient sets without comparing all pairs.
+
+    Each recipe gets a MinHash signature of ``bands * rows`` values, where
+    two signatures agree at a position with probability equal to the
+    Jaccard similarity of the recipes' ingredient sets. Signatures are
+    split into ``bands`` bands of ``rows`` values, and recipes agreeing
+    on a whole band land in the same bucket. A query takes the recipes
+    sharing a bucket with it and ranks only those, by exact similarity.
+
+    More bands find more of the truly similar recipes at the cost of more
+    candidates to rank and more memory; more rows per band make a shared
+    bucket rarer. Pairs become likely candidates above a similarity of
+    about ``(1 / bands) ** (1 / rows)``, 0.4 with the defaults.
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 3, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        generator = random.Random(seed)
+        self._coefficients = [
+            (generator.randrange(1, _PRIME), generator.randrange(_PRIME))
+            for _ in range(bands * rows)
+        ]
+        self._name_keys: Dict[str, str] = {}  # Ingredient name -> normalized key
+        self._key_hashes: Dict[str, Signature] = {}  # Normalized key -> hash per function
+        self._recipes: Dict[int, Recipe] = {}
+        # One bucket table per band, keyed by the hash of the band's values.
+        # Most buckets hold a single recipe, so those store the bare id
+        # rather than a list.
+        self._buckets: List[Dict[int, Union[int, List[int]]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def keys(self, recipe: Recipe) -> FrozenSet[str]:
+        """Return a recipe's normalized ingredient names, so "Egg" and "eggs" match."""
+        name_keys = self._name_keys
+        keys = set()
+        for ingredient in recipe.ingredients:
+            key = name_keys.get(ingredient.name)
+            if key is None:
+                key = name_keys[ingredient.name] = item_key(ingredient.name)
+            keys.add(key)
+        return frozenset(keys)
+
+    def signature(self, keys: Iterable[str]) -> Optional[Signature]:
+        """Return the MinHash signature of a set of normalized ingredient names."""
+        hashes = []
+        for key in keys:
+            key_hashes = self._key_hashes.get(key)
+            if key_hashes is None:
+                value = hash(key) & 0xFFFFFFFFFFFFFFFF
+                key_hashes = self._key_hashes[key] = tuple(
+                    (a * value + b) % _PRIME for a, b in self._coefficients
+                )
+            hashes.append(key_hashes)
+        if not hashes:
+            return None
+        return tuple(map(min, zip(*hashes)))
+
+    def _bands(self, recipe: Recipe) -> Iterator[Tuple[Dict, int]]:
+        """Pair each band's bucket table with the recipe's key in that band."""
+        signature = self.signature(self.keys(recipe))
+        if signature is None:
+            return
+        rows = self.rows
+        for band, buckets in enumerate(self._buckets):
+            yield buckets, hash(signature[band * rows:(band + 1) * rows])
+
+    def add(self, recipe_id: int, recipe: Recipe) -> None:
+        """Index a recipe's ingredients under its id."""
+        self._recipes[recipe_id] = recipe
+        for buckets, key in self._bands(recipe):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = recipe_id
+            elif isinstance(bucket, int):
+                buckets[key] = [bucket, recipe_id]
+            else:
+                bucket.append(recipe_id)
+
+    def remove(self, recipe_id: int, recipe: Recipe) -> None:
+        """Remove a recipe previously indexed under its id."""
+        if self._recipes.pop(recipe_id, None) is None:
+            return
+        for buckets, key in self._bands(recipe):
+            bucket = buckets[key]
+            if isinstance(bucket, int):
+                del buckets[key]
+                continue
+            bucket.remove(recipe_id)
+            if len(bucket) == 1:
+                buckets[key] = bucket[0]
+
+    def similar(self, recipe_id: int, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Return up to ``k`` (recipe id, Jaccard similarity) pairs for the
+        recipes most like the given one, best first, excluding itself.
+        Ties are broken by id, i.e. book order.
+        """
+        recipe = self._recipes.get(recipe_id)
+        if recipe is None:
+            return []
+        candidates: Set[int] = set()
+        for buckets, key in self._bands(recipe):
+            bucket = buckets[key]
+            if isinstance(bucket, int):
+                candidates.add(bucket)
+            else:
+                candidates.update(bucket)
+        candidates.discard(recipe_id)
+
+        keys = self.keys(recipe)
+        scored = []
+        for other in candidates:
+            other_keys = self.keys(self._recipes[other])
+            shared = len(keys & other_keys)
+            scored.append((shared / (len(keys) + len(other_keys) - shared), other))
+        best = heapq.nlargest(k, scored, key=lambda item: (item[0], -item[1]))
+        return [(other, similarity) for similarity, other in best]
@@ -0,0 +1,307 @@
+"""
+Handles persistent storage of recipes in a SQLite database.
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .models import Recipe, Ingredient
+from .storage import BatchResult, Durability, Mutation, VersionConflictError
+
+
+# How each durability level maps onto SQLite's synchronous setting. In WAL
+# mode NORMAL syncs at checkpoints only, which still never corrupts the
+# database; FULL syncs the WAL on every commit.
+SYNCHRONOUS = {
+    Durability.NONE: "OFF",
+    Durability.FSYNC: "NORMAL",
+    Durability.FULL: "FULL",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    instructions TEXT NOT NULL DEFAULT '',
+    calories REAL,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_recipes_title_key ON recipes (title_key);
+
+CREATE TABLE IF NOT EXISTS ingredients (
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    PRIMARY KEY (recipe_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_ingredients_name ON ingredients (name COLLATE NOCASE);
+"""
+
+
+class SqliteRecipeStorage:
+    """
+    Manages recipe storage in a SQLite database.
+
+    Provides the same interface as RecipeStorage. Titles are matched
+    case-insensitively through an indexed ``title_key`` column holding
+    ``title.lower()``, so lookups don't scan the whole book. SQLite does
+    its own locking, so several processes can share the database, and a
+    guarded ``UPDATE ... WHERE version = ?`` enforces expected versions.
+    """
+
+    def __init__(
+        self,
+        database_file: str = "recipes.db",
+        durability: Union[Durability, str] = Durability.FSYNC
+    ):
+        """Initialize storage with a SQLite database path."""
+        self.database_file = database_file
+        self.durability = Durability(durability)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database_file, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if database_file != ":memory:":
+            # WAL lets other processes read while we write.
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS[self.durability]}")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(recipes)")}
+            if "version" not in columns:
+                # Databases created before recipes were versioned
+                self._conn.execute(
+                    "ALTER TABLE recipes ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+                )
+
+    def _insert_ingredients(self, recipe_id: int, recipe: Recipe) -> None:
+        """Insert the ingredient rows for a recipe."""
+        self._conn.executemany(
+            "INSERT INTO ingredients (recipe_id, position, name, amount) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (recipe_id, position, ing.name, ing.amount)
+                for position, ing in enumerate(recipe.ingredients)
+            ]
+        )
+
+    def _build_recipes(self, rows: List[tuple]) -> List[Recipe]:
+        """Build Recipe objects from recipe rows and their ingredients."""
+        if not rows:
+            return []
+        recipes = {
+            recipe_id: Recipe(
+                title=title,
+                instructions=instructions,
+                calories=calories,
+                version=version
+            )
+            for recipe_id, title, instructions, calories, version in rows
+        }
+        for recipe_id, name, amount in self._ingredient_rows(list(recipes)):
+            recipe = recipes.get(recipe_id)
+            if recipe is not None:
+                recipe.ingredients.append(Ingredient(name=name, amount=amount))
+        return list(recipes.values())
+
+    def _ingredient_rows(self, recipe_ids: List[int]) -> Iterable[tuple]:
+        """
+        Return (recipe_id, name, amount) rows in position order, covering at
+        least the given recipes; for many recipes the whole table is read,
+        so callers skip the rows they didn't ask for.
+        """
+        if len(recipe_ids) <= 500:
+            return self._conn.execute(
+                "SELECT recipe_id, name, amount FROM ingredients "
+                f"WHERE recipe_id IN ({', '.join('?' * len(recipe_ids))}) "
+                "ORDER BY recipe_id, position",
+                recipe_ids
+            )
+        return self._conn.execute(
+            "SELECT recipe_id, name, amount FROM ingredients "
+            "ORDER BY recipe_id, position"
+        )
+
+    def get_generation(self) -> tuple:
+        """
+        Return a token that changes whenever the database changes.
+
+        ``data_version`` moves on commits from other connections and
+        ``total_changes`` on our own.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._conn.total_changes)
+
+    def _add(self, recipe: Recipe) -> None:
+        """Insert a recipe row and its ingredients."""
+        cursor = self._conn.execute(
+            "INSERT INTO recipes (title, title_key, instructions, calories) "
+            "VALUES (?, ?, ?, ?)",
+            (recipe.title, recipe.title.lower(), recipe.instructions, recipe.calories)
+        )
+        self._insert_ingredients(cursor.lastrowid, recipe)
+
+    def _update(
+        self,
+        old_title: str,
+        updated_recipe: Recipe,
+        expected_version: Optional[int] = None
+    ) -> bool:
+        """Replace the first recipe with the given title."""
+        row = self._conn.execute(
+            "SELECT id, version FROM recipes WHERE title_key = ? ORDER BY id LIMIT 1",
+            (old_title.lower(),)
+        ).fetchone()
+        if row is None:
+            return False
+        recipe_id, version = row
+        if expected_version is not None and expected_version != version:
+            raise VersionConflictError(old_title, expected_version, version)
+        cursor = self._conn.execute(
+            "UPDATE recipes SET title = ?, title_key = ?, instructions = ?, "
+            "calories = ?, version = version + 1 WHERE id = ? AND version = ?",
+            (
+                updated_recipe.title,
+                updated_recipe.title.lower(),
+                updated_recipe.instructions,
+                updated_recipe.calories,
+                recipe_id,
+                version
+            )
+        )
+        if cursor.rowcount == 0:
+            # Another connection saved the recipe since we read its version
+            if expected_version is not None:
+                raise VersionConflictError(old_title, expected_version, version + 1)
+            return self._update(old_title, updated_recipe)
+        self._conn.execute(
+            "DELETE FROM ingredients WHERE recipe_id = ?", (recipe_id,)
+        )
+        self._insert_ingredients(recipe_id, updated_recipe)
+        return True
+
+    def _delete(self, title: str) -> bool:
+        """Delete every recipe with the given title."""
+        cursor = self._conn.execute(
+            "DELETE FROM recipes WHERE title_key = ?", (title.lower(),)
+        )
+        return cursor.rowcount > 0
+
+    def add_recipe(self, recipe: Recipe) -> None:
+        """Add a new recipe to storage."""
+        with self._lock, self._conn:
+            self._add(recipe)
+
+    def get_all_recipes(
+        self,
+        cached: Optional[Dict[Tuple[str, int], Recipe]] = None
+    ) -> List[Recipe]:
+        """
+        Retrieve all recipes from storage.
+
+        ``cached`` maps (title, version) to recipes the caller already
+        holds. A stored recipe matching one of those in every field is
+        returned as that object instead of being rebuilt. Versions restart
+        at 1 when a recipe is deleted and re-added, so the ingredients are
+        compared too; that reads their rows but skips building objects.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, instructions, calories, version FROM recipes ORDER BY id"
+            ).fetchall()
+            if not cached:
+                return self._build_recipes(rows)
+            candidates: Dict[int, Recipe] = {}
+            for recipe_id, title, instructions, calories, version in rows:
+                recipe = cached.get((title, version))
+                if (recipe is not None and recipe.instructions == instructions
+                        and recipe.calories == calories):
+                    candidates[recipe_id] = recipe
+            stored: Dict[int, List[tuple]] = {recipe_id: [] for recipe_id in candidates}
+            if candidates:
+                for recipe_id, name, amount in self._ingredient_rows(list(candidates)):
+                    ingredients = stored.get(recipe_id)
+                    if ingredients is not None:
+                        ingredients.append((name, amount))
+            reused = {
+                recipe_id: recipe for recipe_id, recipe in candidates.items()
+                if stored[recipe_id] == [(ing.name, ing.amount) for ing in recipe.ingredients]
+            }
+            built = iter(self._build_recipes(
+                [row for row in rows if row[0] not in reused]
+            ))
+        return [
+            reused[row[0]] if row[0] in reused else next(built)
+            for row in rows
+        ]
+
+    def get_recipe_by_title(self, title: str) -> Optional[Recipe]:
+        """Retrieve a recipe by its title."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, instructions, calories, version FROM recipes "
+                "WHERE title_key = ? ORDER BY id LIMIT 1",
+                (title.lower(),)
+            ).fetchall()
+            recipes = self._build_recipes(rows)
+        return recipes[0] if recipes else None
+
+    def update_recipe(
+        self,
+        old_title: str,
+        updated_recipe: Recipe,
+        expected_version: Optional[int] = None
+    ) -> bool:
+        """
+        Update an existing recipe. Returns True if successful.
+
+        If ``expected_version`` is given and the stored recipe has moved on
+        from it, raises VersionConflictError and changes nothing.
+        """
+        with self._lock, self._conn:
+            return self._update(old_title, updated_recipe, expected_version)
+
+    def delete_recipe(self, title: str) -> bool:
+        """Delete a recipe by title. Returns True if successful."""
+        with self._lock, self._conn:
+            return self._delete(title)
+
+    def apply_batch(self, mutations: List[Mutation]) -> BatchResult:
+        """Apply several mutations in a single transaction."""
+        results = []
+        with self._lock:
+            with self._conn:
+                # Take the write lock up front, so no other connection can
+                # commit between reading the generation and our changes
+                self._conn.execute("BEGIN IMMEDIATE")
+                data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                generation_before = (data_version, self._conn.total_changes)
+                for mutation in mutations:
+                    if mutation.op == "add":
+                        self._add(mutation.recipe)
+                        results.append(True)
+                    elif mutation.op == "update":
+                        results.append(self._update(
+                            mutation.title, mutation.recipe, mutation.expected_version
+                        ))
+                    elif mutation.op == "delete":
+                        results.append(self._delete(mutation.title))
+                    else:
+                        raise ValueError(f"Unknown mutation: {mutation.op!r}")
+            # Our own commit leaves data_version alone, while reading it again
+            # could pick up a later commit from another connection
+            generation = (data_version, self._conn.total_changes)
+        return BatchResult(results, generation_before, generation)
+
+    def clear_all(self) -> None:
+        """Clear all recipes from storage."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM recipes")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -4,48 +4,226 @@ Handles persistent storage of recipes using JSON files.
 
 import json
 import os
-from pathlib import Path
-from typing import List, Optional
+import threading
+from bisect import insort
+from contextlib import contextmanager
+from enum import Enum
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
 
 from .models import Recipe
 
 
+class StorageError(Exception):
+    """Raised when stored recipes can't be read back."""
+
+
+class VersionConflictError(StorageError):
+    """Raised when an update expects a recipe version that is no longer current."""
+
+    def __init__(self, title: str, expected: int, actual: int):
+        super().__init__(
+            f"Recipe {title!r} was changed elsewhere "
+            f"(expected version {expected}, found {actual})"
+        )
+        self.title = title
+        self.expected = expected
+        self.actual = actual
+
+
+class Durability(Enum):
+    """
+    How hard a storage write works to survive a crash or power loss.
+    
+    Every level replaces files atomically, so a crash leaves either the old
+    or the new contents, never a truncated file. FSYNC also flushes the new
+    data to disk before it replaces the old, and FULL additionally flushes
+    the directory so the replacement itself survives a power loss.
+    """
+    NONE = "none"
+    FSYNC = "fsync"
+    FULL = "full"
+
+
+def fsync_directory(path: str) -> None:
+    """Flush a directory entry change (create, rename, remove) to disk."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Not supported on Windows; renames there are journaled by NTFS
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(
+    path: str,
+    data,
+    durability: Durability = Durability.FSYNC,
+    indent: Optional[int] = None
+) -> None:
+    """
+    Replace ``path`` with ``data`` as JSON without ever exposing a partial file.
+    
+    The data goes to a temporary file in the same directory, which is then
+    renamed over ``path``. Readers see either the old or the new contents.
+    """
+    tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            if durability != Durability.NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except FileNotFoundError:
+            pass
+        raise
+    if durability == Durability.FULL:
+        fsync_directory(path)
+
+
+class Mutation(NamedTuple):
+    """
+    A buffered change to apply to storage.
+    
+    ``op`` is "add", "update" or "delete". ``title`` is the title to match
+    (the new recipe's title for adds) and ``recipe`` the new recipe data,
+    or None for deletes. An update with ``expected_version`` fails with
+    VersionConflictError unless the stored recipe still has that version.
+    """
+    op: str
+    title: str
+    recipe: Optional[Recipe] = None
+    expected_version: Optional[int] = None
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of apply_batch.
+    
+    ``results`` holds one success flag per mutation. ``generation_before``
+    and ``generation`` are the storage generations just before and just
+    after the batch, both read under the write lock, so a caller can tell
+    whether anyone else wrote in between its last read and the batch.
+    """
+    results: List[bool]
+    generation_before: object
+    generation: object
+
+
 class RecipeStorage:
-    """Manages recipe storage in a JSON file."""
+    """
+    Manages recipe storage in a JSON file.
+    
+    Every write replaces the file atomically; ``durability`` chooses how
+    much fsyncing backs that up. Batched changes (see apply_batch and
+    RecipeBook.transaction) share a single write and a single fsync.
     
-    def __init__(self, storage_file: str = "recipes.json"):
+    Several processes may share the file. Writers hold an advisory lock
+    on ``<storage_file>.lock`` for their whole read-modify-write, so no
+    update is lost; readers take no lock, since the atomic replace means
+    they always see a complete file. Each save bumps the saved recipe's
+    ``version``, which updates can check for optimistic concurrency.
+    """
+    
+    def __init__(
+        self,
+        storage_file: str = "recipes.json",
+        durability: Union[Durability, str] = Durability.FSYNC
+    ):
         """Initialize storage with a JSON file path."""
         self.storage_file = storage_file
+        self.lock_file = storage_file + ".lock"
+        self.durability = Durability(durability)
+        self._write_lock = threading.Lock()
         self._ensure_storage_file()
     
     def _ensure_storage_file(self) -> None:
         """Create storage file if it doesn't exist."""
         if not os.path.exists(self.storage_file):
-            self._write_recipes([])
+            with self._locked():
+                if not os.path.exists(self.storage_file):
+                    self._write_recipes([])
     
-    def _read_recipes(self) -> List[dict]:
-        """Read recipes from JSON file."""
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the exclusive write lock, across threads and processes."""
+        with self._write_lock, open(self.lock_file, 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield  # Closing the file releases the lock
+    
+    def _read_file(self):
+        """
+        Read the JSON file.
+        
+        Raises StorageError if the file is corrupt, rather than returning
+        an empty book that the next save would write over it.
+        """
         try:
             with open(self.storage_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+        except FileNotFoundError:
             return []
+        except json.JSONDecodeError as e:
+            raise StorageError(f"{self.storage_file} is corrupt: {e}") from e
+    
+    def _read_recipes(self) -> List[dict]:
+        """Read recipes from JSON file."""
+        data = self._read_file()
+        # A JournaledRecipeStorage snapshot wraps its recipes in an object
+        return data["recipes"] if isinstance(data, dict) else data
     
     def _write_recipes(self, recipes: List[dict]) -> None:
-        """Write recipes to JSON file."""
-        with open(self.storage_file, 'w', encoding='utf-8') as f:
-            json.dump(recipes, f, indent=2, ensure_ascii=False)
+        """Atomically replace the JSON file with the given recipes."""
+        write_json_atomic(self.storage_file, recipes, self.durability, indent=2)
+    
+    def get_generation(self) -> Optional[tuple]:
+        """
+        Return a token that changes whenever the storage file changes.
+        
+        Callers holding recipes in memory compare tokens to detect writes
+        made by other processes or storage objects.
+        """
+        try:
+            stat = os.stat(self.storage_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
     
     def add_recipe(self, recipe: Recipe) -> None:
         """Add a new recipe to storage."""
-        recipes = self._read_recipes()
-        recipes.append(recipe.to_dict())
-        self._write_recipes(recipes)
+        self.apply_batch([Mutation("add", recipe.title, recipe)])
     
-    def get_all_recipes(self) -> List[Recipe]:
-        """Retrieve all recipes from storage."""
-        recipes_data = self._read_recipes()
-        return [Recipe.from_dict(data) for data in recipes_data]
+    def get_all_recipes(
+        self,
+        cached: Optional[Dict[Tuple[str, int], Recipe]] = None
+    ) -> List[Recipe]:
+        """
+        Retrieve all recipes from storage.
+        
+        ``cached`` maps (title, version) to recipes the caller already
+        holds. A stored recipe matching one of those is returned as that
+        object instead of being rebuilt, so a caller holding older copies
+        only pays for the recipes that changed.
+        """
+        recipes = []
+        for data in self._read_recipes():
+            recipe = cached.get((data["title"], data.get("version", 0))) if cached else None
+            # Versions restart at 1 if a recipe is deleted and re-added, so
+            # confirm the match; comparing dicts is much cheaper than from_dict.
+            if recipe is None or recipe.to_dict() != data:
+                recipe = Recipe.from_dict(data)
+            recipes.append(recipe)
+        return recipes
     
     def get_recipe_by_title(self, title: str) -> Optional[Recipe]:
         """Retrieve a recipe by its title."""
@@ -55,30 +233,383 @@ class RecipeStorage:
                 return recipe
         return None
     
-    def update_recipe(self, old_title: str, updated_recipe: Recipe) -> bool:
-        """Update an existing recipe. Returns True if successful."""
-        recipes_data = self._read_recipes()
-        for i, recipe_data in enumerate(recipes_data):
-            if recipe_data["title"].lower() == old_title.lower():
-                recipes_data[i] = updated_recipe.to_dict()
-                self._write_recipes(recipes_data)
-                return True
-        return False
+    def update_recipe(
+        self,
+        old_title: str,
+        updated_recipe: Recipe,
+        expected_version: Optional[int] = None
+    ) -> bool:
+        """
+        Update an existing recipe. Returns True if successful.
+        
+        If ``expected_version`` is given and the stored recipe has moved on
+        from it, raises VersionConflictError and changes nothing.
+        """
+        return self.apply_batch(
+            [Mutation("update", old_title, updated_recipe, expected_version)]
+        ).results[0]
     
     def delete_recipe(self, title: str) -> bool:
         """Delete a recipe by title. Returns True if successful."""
-        recipes_data = self._read_recipes()
-        original_count = len(recipes_data)
-        recipes_data = [
-            r for r in recipes_data
-            if r["title"].lower() != title.lower()
-        ]
-        if len(recipes_data) < original_count:
-            self._write_recipes(recipes_data)
-            return True
-        return False
+        return self.apply_batch([Mutation("delete", title)]).results[0]
+    
+    def apply_batch(self, mutations: List[Mutation]) -> BatchResult:
+        """
+        Apply several mutations with a single read and a single write.
+        
+        The results hold one flag per mutation, matching what add_recipe,
+        update_recipe and delete_recipe would have returned. A version
+        conflict raises VersionConflictError before anything is written.
+        """
+        with self._locked():
+            generation_before = self.get_generation()
+            recipes_data: List[Optional[dict]] = self._read_recipes()
+            positions: Dict[str, List[int]] = {}  # Lowercase title -> list indexes
+            for i, data in enumerate(recipes_data):
+                positions.setdefault(data["title"].lower(), []).append(i)
+            
+            results = []
+            for mutation in mutations:
+                key = mutation.title.lower()
+                if mutation.op == "add":
+                    data = mutation.recipe.to_dict()
+                    data["version"] = 1
+                    positions.setdefault(key, []).append(len(recipes_data))
+                    recipes_data.append(data)
+                    results.append(True)
+                elif mutation.op == "update":
+                    indexes = positions.get(key)
+                    if not indexes:
+                        results.append(False)
+                        continue
+                    i = indexes[0]
+                    version = recipes_data[i].get("version", 0)
+                    if (mutation.expected_version is not None
+                            and mutation.expected_version != version):
+                        raise VersionConflictError(
+                            mutation.title, mutation.expected_version, version
+                        )
+                    indexes.pop(0)
+                    if not indexes:
+                        del positions[key]
+                    data = mutation.recipe.to_dict()
+                    data["version"] = version + 1
+                    recipes_data[i] = data
+                    insort(positions.setdefault(mutation.recipe.title.lower(), []), i)
+                    results.append(True)
+                elif mutation.op == "delete":
+                    indexes = positions.pop(key, None)
+                    for i in indexes or []:
+                        recipes_data[i] = None  # Dropped when writing
+                    results.append(bool(indexes))
+                else:
+                    raise ValueError(f"Unknown mutation: {mutation.op!r}")
+            
+            if any(results):
+                self._write_recipes([data for data in recipes_data if data is not None])
+            return BatchResult(results, generation_before, self.get_generation())
     
     def clear_all(self) -> None:
         """Clear all recipes from storage."""
-        self._write_recipes([])
+        with self._locked():
+            self._write_recipes([])
+
+
+class JournaledRecipeStorage(RecipeStorage):
+    """
+    Recipe storage that appends each mutation to a journal file.
+
+    The JSON file at ``storage_file`` is used as a snapshot; every add,
+    update and delete is appended as one JSON line to
+    ``<storage_file>.journal``. On load the snapshot is read and the
+    journal replayed on top of it. Once the journal grows past
+    ``compact_threshold`` records it is folded back into the snapshot by
+    a background thread.
+
+    Journal records carry increasing sequence numbers, and the snapshot
+    stores the sequence of the last record it includes alongside the
+    recipes, so records left behind by a crash after the snapshot was
+    written are skipped on replay rather than applied twice. RecipeStorage
+    reads the snapshot too, and a plain RecipeStorage file is read as a
+    snapshot at sequence 0.
+
+    Unless ``durability`` is NONE, each append is fsynced before it
+    returns; a batch of mutations is one append, so it pays one fsync.
+
+    As in RecipeStorage, recipes sharing a title are kept side by side:
+    an update changes the first of them and a delete removes them all.
+
+    The current state lives in memory, so only one process should write
+    through a JournaledRecipeStorage at a time; share a book between
+    processes with RecipeStorage or SqliteRecipeStorage instead.
+    """
+
+    def __init__(
+        self,
+        storage_file: str = "recipes.json",
+        compact_threshold: int = 1000,
+        durability: Union[Durability, str] = Durability.FSYNC
+    ):
+        """Initialize storage, replaying any existing journal."""
+        self.journal_file = storage_file + ".journal"
+        self.compact_threshold = compact_threshold
+        self._recipes: Dict[int, dict] = {}  # Recipe id -> data, in book order
+        self._titles: Dict[str, List[int]] = {}  # Lowercase title -> recipe ids
+        self._next_id = 0
+        self._sequence = 0  # Sequence number of the last journal record applied
+        self._journal_records = 0
+        self._generation = 0
+        self._lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        super().__init__(storage_file, durability)
+        self._load()
+        self._journal = open(self.journal_file, 'a', encoding='utf-8')
+
+    @property
+    def _rotated_journal_file(self) -> str:
+        return self.journal_file + ".1"
+
+    def _load(self) -> None:
+        """Read the snapshot and replay the journal records it doesn't include."""
+        snapshot = self._read_file()
+        if isinstance(snapshot, dict):
+            self._sequence = snapshot.get("sequence", 0)
+            snapshot = snapshot["recipes"]
+        for data in snapshot:
+            self._insert(data)
+        snapshot_sequence = self._sequence
+        for path in (self._rotated_journal_file, self.journal_file):
+            for record in self._read_journal(path):
+                self._journal_records += 1
+                sequence = record.get("seq")
+                if sequence is not None:
+                    if sequence <= snapshot_sequence:
+                        continue  # Already in the snapshot
+                    self._sequence = sequence
+                self._apply_record(record)
+
+    @staticmethod
+    def _snapshot(sequence: int, recipes: List[dict]) -> dict:
+        """Build the snapshot file contents."""
+        return {"sequence": sequence, "recipes": recipes}
+
+    def _write_recipes(self, recipes: List[dict]) -> None:
+        """Atomically replace the snapshot, covering every record applied so far."""
+        write_json_atomic(
+            self.storage_file, self._snapshot(self._sequence, recipes), self.durability
+        )
+
+    @staticmethod
+    def _read_journal(path: str) -> Iterator[dict]:
+        """Yield journal records, stopping at a torn final line."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-append leaves a partial last line.
+                        return
+        except FileNotFoundError:
+            return
+
+    def _insert(self, data: dict) -> None:
+        """Append a recipe to the in-memory state."""
+        recipe_id = self._next_id
+        self._next_id += 1
+        self._recipes[recipe_id] = data
+        self._titles.setdefault(data["title"].lower(), []).append(recipe_id)
+
+    def _apply_record(self, record: dict) -> bool:
+        """Apply a journal record to the in-memory state."""
+        op = record["op"]
+        key = record["title"].lower()
+        if op == "add":
+            record["recipe"]["version"] = 1
+            self._insert(record["recipe"])
+            return True
+        ids = self._titles.get(key)
+        if not ids:
+            return False
+        if op == "delete":
+            for recipe_id in self._titles.pop(key):
+                del self._recipes[recipe_id]
+        elif op == "update":
+            recipe_id = ids.pop(0)
+            if not ids:
+                del self._titles[key]
+            data = record["recipe"]
+            data["version"] = self._recipes[recipe_id].get("version", 0) + 1
+            # Replacing the value in place keeps the recipe's position
+            self._recipes[recipe_id] = data
+            insort(self._titles.setdefault(data["title"].lower(), []), recipe_id)
+        return True
+
+    def _append(self, records: List[dict]) -> List[bool]:
+        """Apply records and append the ones that changed state in one write."""
+        with self._lock:
+            results = [self._apply_record(record) for record in records]
+            lines = []
+            for record, applied in zip(records, results):
+                if applied:
+                    self._sequence += 1
+                    record["seq"] = self._sequence
+                    lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+            if not lines:
+                return results
+            self._journal.write("".join(lines))
+            self._journal.flush()
+            if self.durability != Durability.NONE:
+                os.fsync(self._journal.fileno())
+            self._journal_records += len(lines)
+            self._generation += 1
+            if self._journal_records >= self.compact_threshold:
+                self.compact(wait=False)
+            return results
+
+    @staticmethod
+    def _record(mutation: Mutation) -> dict:
+        """Build the journal record for a mutation."""
+        if mutation.op not in ("add", "update", "delete"):
+            raise ValueError(f"Unknown mutation: {mutation.op!r}")
+        record = {"op": mutation.op, "title": mutation.title}
+        if mutation.recipe is not None:
+            record["recipe"] = mutation.recipe.to_dict()
+        return record
+
+    def _read_recipes(self) -> List[dict]:
+        """Return the current recipes, including journaled changes."""
+        with self._lock:
+            return list(self._recipes.values())
+
+    def get_generation(self) -> int:
+        """Return a counter that changes on every mutation through this object."""
+        return self._generation
+
+    def get_recipe_by_title(self, title: str) -> Optional[Recipe]:
+        """Retrieve a recipe by its title."""
+        with self._lock:
+            ids = self._titles.get(title.lower())
+            data = self._recipes[ids[0]] if ids else None
+        return Recipe.from_dict(data) if data is not None else None
+
+    def _check_versions(self, mutations: List[Mutation]) -> None:
+        """Raise VersionConflictError if any update expects a stale version."""
+        # Title lists and versions as changed by earlier mutations in the batch
+        titles: Dict[str, List[int]] = {}
+        versions: Dict[int, int] = {}
+        next_id = self._next_id
+
+        def ids_titled(title: str) -> List[int]:
+            key = title.lower()
+            if key not in titles:
+                titles[key] = list(self._titles.get(key, ()))
+            return titles[key]
+
+        for mutation in mutations:
+            ids = ids_titled(mutation.title)
+            if mutation.op == "add":
+                ids.append(next_id)
+                versions[next_id] = 1
+                next_id += 1
+            elif not ids:
+                continue
+            elif mutation.op == "delete":
+                ids.clear()
+            elif mutation.op == "update":
+                recipe_id = ids[0]
+                if recipe_id in versions:
+                    version = versions[recipe_id]
+                else:
+                    version = self._recipes[recipe_id].get("version", 0)
+                if (mutation.expected_version is not None
+                        and mutation.expected_version != version):
+                    raise VersionConflictError(
+                        mutation.title, mutation.expected_version, version
+                    )
+                ids.pop(0)
+                versions[recipe_id] = version + 1
+                insort(ids_titled(mutation.recipe.title), recipe_id)
+
+    def apply_batch(self, mutations: List[Mutation]) -> BatchResult:
+        """Apply several mutations, appending them to the journal in one write."""
+        records = [self._record(mutation) for mutation in mutations]
+        with self._lock:
+            self._check_versions(mutations)
+            generation_before = self._generation
+            results = self._append(records)
+            return BatchResult(results, generation_before, self._generation)
+
+    def clear_all(self) -> None:
+        """Clear all recipes from storage."""
+        self.wait_for_compaction()
+        with self._lock:
+            self._recipes = {}
+            self._titles = {}
+            self._write_recipes([])
+            self._reset_journal()
+            self._generation += 1
+
+    def compact(self, wait: bool = True) -> None:
+        """
+        Fold the journal into the snapshot file.
+
+        The current journal is rotated aside under the lock, so mutations
+        can keep appending to a fresh journal while the snapshot is written.
+        With ``wait=False`` the snapshot is written by a background thread.
+        """
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                if wait:
+                    self._compaction.join()
+                return
+            self._journal.close()
+            self._rotate_journal()
+            self._journal = open(self.journal_file, 'a', encoding='utf-8')
+            self._journal_records = 0
+            snapshot = self._snapshot(self._sequence, list(self._recipes.values()))
+            self._compaction = threading.Thread(
+                target=self._write_snapshot,
+                args=(snapshot,),
+                daemon=True
+            )
+            self._compaction.start()
+        if wait:
+            self._compaction.join()
+
+    def _rotate_journal(self) -> None:
+        """Move the journal aside, keeping records of a failed compaction."""
+        if not os.path.exists(self._rotated_journal_file):
+            os.replace(self.journal_file, self._rotated_journal_file)
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as src, \
+                open(self._rotated_journal_file, 'a', encoding='utf-8') as dst:
+            dst.write(src.read())
+        os.remove(self.journal_file)
+
+    def wait_for_compaction(self) -> None:
+        """Block until a running background compaction has finished."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def _write_snapshot(self, snapshot: dict) -> None:
+        """Atomically replace the snapshot, then drop the rotated journal."""
+        # The rotated journal is only removed once the snapshot holding its
+        # records is durable, whatever durability the appends use.
+        write_json_atomic(self.storage_file, snapshot, Durability.FULL)
+        os.remove(self._rotated_journal_file)
+
+    def _reset_journal(self) -> None:
+        """Truncate the journal after the snapshot has absorbed it."""
+        self._journal.close()
+        self._journal = open(self.journal_file, 'w', encoding='utf-8')
+        self._journal_records = 0
+        if os.path.exists(self._rotated_journal_file):
+            os.remove(self._rotated_journal_file)
 
+    def close(self) -> None:
+        """Finish any compaction in progress and close the journal."""
+        self.wait_for_compaction()
+        with self._lock:
+            self._journal.close()
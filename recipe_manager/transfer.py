@@ -0,0 +1,70 @@
+"""
+Streaming import and export of recipes as newline-delimited JSON.
+
+Each line holds one Recipe.to_dict() object, so books of any size can be
+moved without holding the whole document in memory. Paths ending in .gz
+are gzip-compressed and paths ending in .zst are zstd-compressed (the
+latter needs the optional ``zstandard`` package). "-" means stdin/stdout.
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import sys
+from typing import IO, Iterable, Iterator
+
+from .models import Recipe
+
+
+@contextlib.contextmanager
+def open_stream(path: str, mode: str = "r") -> Iterator[IO[str]]:
+    """Open an NDJSON file for text reading ("r") or writing ("w")."""
+    if mode not in ("r", "w"):
+        raise ValueError(f"mode must be 'r' or 'w', not {mode!r}")
+    if path == "-":
+        yield sys.stdin if mode == "r" else sys.stdout
+    elif path.endswith(".gz"):
+        with gzip.open(path, mode + "t", encoding="utf-8") as f:
+            yield f
+    elif path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError(
+                "Reading or writing .zst files requires the 'zstandard' package"
+            ) from None
+        with open(path, mode + "b") as raw:
+            if mode == "r":
+                binary = zstandard.ZstdDecompressor().stream_reader(raw)
+            else:
+                binary = zstandard.ZstdCompressor().stream_writer(raw)
+            with io.TextIOWrapper(binary, encoding="utf-8") as f:
+                yield f
+    else:
+        with open(path, mode, encoding="utf-8") as f:
+            yield f
+
+
+def read_ndjson(path: str) -> Iterator[Recipe]:
+    """Yield recipes from an NDJSON file one line at a time."""
+    with open_stream(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield Recipe.from_dict(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid recipe: {e}") from e
+
+
+def write_ndjson(recipes: Iterable[Recipe], path: str) -> int:
+    """Write recipes to an NDJSON file as they are produced. Returns the count."""
+    count = 0
+    with open_stream(path, "w") as f:
+        for recipe in recipes:
+            f.write(json.dumps(recipe.to_dict(), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+        f.flush()
+    return count
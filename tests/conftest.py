@@ -0,0 +1,64 @@
+"""
+Shared fixtures: every storage backend, and books on top of them.
+"""
+
+import pytest
+
+from recipe_manager import JournaledRecipeStorage, RecipeBook, RecipeStorage
+from recipe_manager.sqlite_storage import SqliteRecipeStorage
+
+# Backend name -> function opening that backend's storage in a directory
+BACKENDS = {
+    "json": lambda directory: RecipeStorage(str(directory / "recipes.json")),
+    "journal": lambda directory: JournaledRecipeStorage(str(directory / "recipes.json")),
+    "sqlite": lambda directory: SqliteRecipeStorage(str(directory / "recipes.db")),
+}
+
+
+def close(storage) -> None:
+    """Close a storage that holds open files or connections."""
+    if hasattr(storage, "close"):
+        storage.close()
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+def open_storage(backend, tmp_path):
+    """Open (or reopen) the backend's storage in the test's directory."""
+    opened = []
+
+    def open_storage():
+        storage = BACKENDS[backend](tmp_path)
+        opened.append(storage)
+        return storage
+
+    yield open_storage
+    for storage in opened:
+        close(storage)
+
+
+@pytest.fixture
+def storage(open_storage):
+    return open_storage()
+
+
+@pytest.fixture
+def other_storage(storage, open_storage):
+    """
+    A second writer on the same data, standing in for another process.
+
+    A journal's state lives in memory, so only one object may write to
+    it; there the second writer shares the storage object.
+    """
+    if isinstance(storage, JournaledRecipeStorage):
+        return storage
+    return open_storage()
+
+
+@pytest.fixture
+def book(storage) -> RecipeBook:
+    return RecipeBook(storage)
@@ -0,0 +1,63 @@
+"""
+The column-oriented snapshot behind RecipeBook.columns().
+"""
+
+import math
+
+from recipe_manager import Ingredient, Recipe
+
+
+def make_recipe(title, *names, calories=None):
+    return Recipe(title, [Ingredient(name, "1 cup") for name in names], calories=calories)
+
+
+def fill_book(book):
+    book.add_recipes([
+        make_recipe("Pancakes", "flour", "milk", "egg", calories=400.0),
+        make_recipe("Omelette", "Egg", "milk", "egg", calories=300.0),
+        make_recipe("Salad", "lettuce", "tomato"),
+    ])
+
+
+def test_csr_contents(book):
+    fill_book(book)
+    columns = book.columns()
+    assert len(columns) == 3
+    assert columns.titles == ["Pancakes", "Omelette", "Salad"]
+    assert list(columns.ingredient_counts) == [3, 3, 2]
+    assert columns.calories[:2].tolist() == [400.0, 300.0]
+    assert math.isnan(columns.calories[2])
+    assert columns.ingredient_names == ["flour", "milk", "egg", "lettuce", "tomato"]
+    # Each row lists its distinct ingredient ids in ascending order
+    assert list(columns.indptr) == [0, 3, 5, 7]
+    assert list(columns.indices) == [0, 1, 2, 1, 2, 3, 4]
+    assert list(columns.row(1)) == [1, 2]
+    assert list(columns.rows_with("EGG")) == [0, 1]
+    assert list(columns.rows_with("saffron")) == []
+
+
+def test_analytics(book):
+    fill_book(book)
+    columns = book.columns()
+    assert columns.top_ingredients(2) == [("milk", 2), ("egg", 2)]
+    assert columns.co_occurring("milk") == [("egg", 2), ("flour", 1)]
+    assert columns.top_pairs(1) == [("milk", "egg", 2)]
+    assert columns.mean_ingredient_count_by_calories(band=250) == {250.0: 3.0}
+
+
+def test_snapshot_is_rebuilt_only_after_changes(book):
+    fill_book(book)
+    columns = book.columns()
+    assert book.columns() is columns
+    book.search_recipes("egg")
+    assert book.columns() is columns
+
+    book.update_recipe("Salad", make_recipe("Salad", "lettuce", calories=50.0))
+    rebuilt = book.columns()
+    assert rebuilt is not columns
+    assert list(rebuilt.ingredient_counts) == [3, 3, 1]
+    assert list(columns.ingredient_counts) == [3, 3, 2]  # Old snapshot unchanged
+    book.delete_recipe("Pancakes")
+    assert book.columns().titles == ["Omelette", "Salad"]
+    book.add_recipe(make_recipe("Toast", "bread"))
+    assert book.columns().titles == ["Omelette", "Salad", "Toast"]
@@ -0,0 +1,85 @@
+"""
+The calorie enrichment job against the local nutrition server.
+"""
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe, RecipeBook
+from recipe_manager.enrichment import AsyncEnrichmentJob
+from recipe_manager.nutrition_server import NutritionServer
+
+
+@pytest.fixture
+def server():
+    server = NutritionServer().start()
+    yield server
+    server.stop()
+
+
+def fill_book(book):
+    book.add_recipes([
+        Recipe("Pancakes", [Ingredient("flour", "1 cup"), Ingredient("milk", "1 cup")]),
+        Recipe("Omelette", [Ingredient("egg", "3")]),
+        Recipe("Porridge", [Ingredient("oats", "1/2 cup"), Ingredient("milk", "1 cup")]),
+        Recipe("Mystery", [Ingredient("unobtainium", "1 cup")]),
+    ])
+
+
+def test_fills_in_calories(book, server):
+    fill_book(book)
+    result = AsyncEnrichmentJob(book, server.url).run()
+    assert result.recipes_updated == 3
+    assert result.lookups == 5  # The shared cup of milk is looked up once
+    assert result.conflicts == 0
+    calories = {recipe.title: recipe.calories for recipe in book.get_all_recipes()}
+    assert all(calories[title] > 0 for title in ("Pancakes", "Omelette", "Porridge"))
+    assert calories["Mystery"] is None
+    assert RecipeBook(book.storage).get_recipe("Omelette").calories == calories["Omelette"]
+
+
+def test_retries_failed_requests(book, server):
+    fill_book(book)
+    server.failure_rate = 0.5
+    server.random.seed(1)
+    job = AsyncEnrichmentJob(book, server.url, lookup_batch_size=1, max_retries=10, backoff=0.0)
+    result = job.run()
+    assert result.retries > 0
+    assert result.failed_batches == 0
+    assert result.recipes_updated == 3
+
+
+def test_duplicate_titles_update_only_the_first(book, server):
+    book.add_recipes([
+        Recipe("Soup", [Ingredient("milk", "1 cup")]),
+        Recipe("soup", [Ingredient("flour", "1 cup")]),
+    ])
+    result = AsyncEnrichmentJob(book, server.url).run()
+    assert (result.recipes_updated, result.duplicates, result.conflicts) == (1, 1, 0)
+    first, second = book.get_all_recipes()
+    assert first.calories is not None
+    assert second.calories is None
+    # A rerun finds nothing more to do rather than retrying the duplicate
+    result = AsyncEnrichmentJob(book, server.url).run()
+    assert (result.recipes_updated, result.duplicates) == (0, 1)
+
+
+def test_skips_only_recipes_edited_during_the_run(book, other_storage, server):
+    fill_book(book)
+
+    class EditingJob(AsyncEnrichmentJob):
+        """Saves a recipe elsewhere right after the job has checked versions."""
+        edited = False
+
+        def _is_current(self, title, version):
+            if not self.edited:
+                self.edited = True
+                other_storage.update_recipe(
+                    "Porridge", Recipe("Porridge", [Ingredient("oats", "1 cup")])
+                )
+            return super()._is_current(title, version)
+
+    result = EditingJob(book, server.url).run()
+    assert result.conflicts == 1
+    assert result.recipes_updated == 2
+    assert book.get_recipe("Porridge").calories is None
+    assert book.get_recipe("Pancakes").calories is not None
@@ -0,0 +1,129 @@
+"""
+JournaledRecipeStorage replay and compaction, including crashes part way.
+"""
+
+import json
+import os
+
+import pytest
+
+from recipe_manager import JournaledRecipeStorage, Recipe, RecipeStorage
+from recipe_manager.storage import Mutation
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "recipes.json")
+
+
+@pytest.fixture
+def reopen(path):
+    """Open the journal at ``path`` again, as a restarted process would."""
+    opened = []
+
+    def reopen(**kwargs):
+        storage = JournaledRecipeStorage(path, **kwargs)
+        opened.append(storage)
+        return storage
+
+    yield reopen
+    for storage in opened:
+        storage.close()
+
+
+def contents(storage):
+    return [(recipe.title, recipe.version) for recipe in storage.get_all_recipes()]
+
+
+def fill(storage):
+    storage.apply_batch([Mutation("add", title, Recipe(title)) for title in ("A", "B", "C")])
+    storage.update_recipe("B", Recipe("B", instructions="edited"))
+    storage.delete_recipe("C")
+
+
+def test_replays_journal_on_reopen(reopen):
+    storage = reopen()
+    fill(storage)
+    storage.close()
+    assert contents(reopen()) == [("A", 1), ("B", 2)]
+
+
+def test_compaction_folds_journal_into_snapshot(path, reopen):
+    storage = reopen()
+    fill(storage)
+    storage.compact()
+    assert os.path.getsize(storage.journal_file) == 0
+    assert not os.path.exists(storage.journal_file + ".1")
+    storage.add_recipe(Recipe("D"))
+    storage.close()
+    assert contents(reopen()) == [("A", 1), ("B", 2), ("D", 1)]
+    assert [data["title"] for data in RecipeStorage(path)._read_recipes()] == ["A", "B"]
+
+
+def test_compacts_automatically_past_threshold(reopen):
+    storage = reopen(compact_threshold=3)
+    fill(storage)
+    storage.wait_for_compaction()
+    assert storage._journal_records < 3
+    storage.close()
+    assert contents(reopen()) == [("A", 1), ("B", 2)]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_crash_before_rotated_journal_is_removed(reopen, monkeypatch):
+    storage = reopen()
+    storage.apply_batch([Mutation("add", title, Recipe(title)) for title in ("A", "B")])
+    remove = os.remove
+
+    def crash(target):
+        if target.endswith(".journal.1"):
+            raise OSError("crashed")
+        remove(target)
+
+    monkeypatch.setattr(os, "remove", crash)
+    storage.compact()
+    monkeypatch.undo()
+    storage.close()
+    assert os.path.exists(storage.journal_file + ".1")
+
+    storage = reopen()
+    assert contents(storage) == [("A", 1), ("B", 1)]
+    # The next compaction absorbs the leftover journal
+    storage.add_recipe(Recipe("C"))
+    storage.compact()
+    storage.close()
+    assert contents(reopen()) == [("A", 1), ("B", 1), ("C", 1)]
+
+
+def test_crash_while_clearing(reopen, monkeypatch):
+    storage = reopen()
+    storage.add_recipe(Recipe("A"))
+
+    def crash():
+        raise OSError("crashed")
+
+    monkeypatch.setattr(storage, "_reset_journal", crash)
+    with pytest.raises(OSError):
+        storage.clear_all()
+    monkeypatch.undo()
+    storage.close()
+    assert contents(reopen()) == []
+
+
+def test_ignores_torn_final_line(reopen):
+    storage = reopen()
+    storage.add_recipe(Recipe("A"))
+    storage.close()
+    with open(storage.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "title": "B", "rec')
+    assert contents(reopen()) == [("A", 1)]
+
+
+def test_reads_a_plain_recipe_storage_file(path, reopen):
+    RecipeStorage(path).add_recipe(Recipe("A"))
+    storage = reopen()
+    assert contents(storage) == [("A", 1)]
+    storage.add_recipe(Recipe("B"))
+    storage.compact()
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)["sequence"] == 1
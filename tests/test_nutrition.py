@@ -0,0 +1,35 @@
+"""
+Nutrition lookup keys and providers.
+"""
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe
+from recipe_manager.nutrition import NutritionProvider, NutritionService, ingredient_key
+
+
+def test_equal_amounts_share_a_key():
+    cup = ingredient_key(Ingredient("Milk", "1 cup"))
+    assert cup == ingredient_key(Ingredient("milk", "16 tbsp"))
+    assert cup == ingredient_key(Ingredient("milk", "48 tsp"))
+    assert ingredient_key(Ingredient("flour", "1 lb")) == ingredient_key(Ingredient("flour", "16 oz"))
+    assert ingredient_key(Ingredient("salt", "to taste")) is None
+
+
+def test_provider_must_implement_lookup_batch():
+    class Incomplete(NutritionProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_enrich_book_with_duplicate_titles(book):
+    book.add_recipes([
+        Recipe("Soup", [Ingredient("milk", "1 cup")]),
+        Recipe("soup", [Ingredient("flour", "1 cup")]),
+    ])
+    assert NutritionService().enrich_book(book) == 1
+    first, second = book.get_all_recipes()
+    assert first.calories is not None
+    assert second.calories is None
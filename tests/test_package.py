@@ -0,0 +1,53 @@
+"""
+Package imports and the command-line interface.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+from recipe_manager import Ingredient, Recipe
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_star_import_skips_lazy_modules():
+    code = (
+        "import sys\n"
+        "from recipe_manager import *\n"
+        "print(sorted({'tkinter', 'sqlite3'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_cli_search_lists_every_match(book, monkeypatch, capsys):
+    book.add_recipes(
+        [Recipe(f"Chicken {i}", [Ingredient("chicken", "1 lb")]) for i in range(25)]
+        + [Recipe("Chickpea Curry", [Ingredient("chickpeas", "1 can")])]
+    )
+    monkeypatch.setattr("builtins.input", lambda prompt: "chick")
+    main.search_recipes(book)
+    assert "Found 26 matching recipe(s)" in capsys.readouterr().out
+    monkeypatch.setattr("builtins.input", lambda prompt: "chicken")
+    main.search_recipes(book)
+    assert "Found 25 matching recipe(s)" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("contents", [None, "not json\n"])
+def test_cli_import_reports_bad_files(tmp_path, contents):
+    path = tmp_path / "recipes.ndjson"
+    if contents is not None:
+        path.write_text(contents, encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), "import", str(path)],
+        cwd=tmp_path, capture_output=True, text=True
+    )
+    assert result.returncode == 1
+    assert result.stderr.startswith("Error: ")
+    assert "Traceback" not in result.stderr
@@ -0,0 +1,17 @@
+"""
+Pantry-based recipe suggestions.
+"""
+
+from recipe_manager import Ingredient, PantryMatcher, Recipe
+
+
+def test_blank_items_cover_nothing(book):
+    book.add_recipes([
+        Recipe("Omelette", [Ingredient("eggs", "3"), Ingredient("butter", "1 tbsp")]),
+        Recipe("Toast", [Ingredient("bread", "2 slices")]),
+    ])
+    matcher = PantryMatcher(book, ["", "  ", "Eggs"])
+    assert matcher.pantry == frozenset({"eggs"})
+    [suggestion] = matcher.suggest()
+    assert suggestion.recipe.title == "Omelette"
+    assert suggestion.missing == ["butter"]
@@ -0,0 +1,143 @@
+"""
+The indexed queries, checked against the plain scans they replaced.
+"""
+
+import random
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe, SortBy
+
+WORDS = ["garlic", "Garlic Cloves", "olive oil", "oil", "milk", "Oat Milk", "egg",
+         "eggplant", "salt", "sea salt", "flour", "crème fraîche", "lime", "sublime"]
+
+
+def titles(recipes):
+    return [recipe.title for recipe in recipes]
+
+
+def reference_filter(recipes, included, excluded):
+    """filter_by_ingredients before the inverted index."""
+    results = []
+    for recipe in recipes:
+        names = [ingredient.name.lower() for ingredient in recipe.ingredients]
+        if (all(any(term.lower() in name for name in names) for term in included)
+                and not any(term.lower() in name for term in excluded for name in names)):
+            results.append(recipe)
+    return results
+
+
+def reference_search(recipes, query):
+    """search_recipes before the trigram index."""
+    query = query.lower()
+    return [
+        recipe for recipe in recipes
+        if query in recipe.title.lower()
+        or any(query in ingredient.name.lower() for ingredient in recipe.ingredients)
+    ]
+
+
+# The sort keys sort_recipes used before the maintained sorted views
+REFERENCE_SORT_KEYS = {
+    SortBy.ALPHABETICAL: lambda r: r.title.lower(),
+    SortBy.INGREDIENT_COUNT: lambda r: r.get_ingredient_count(),
+    SortBy.CALORIES: lambda r: (r.calories is None, r.calories or 0),
+}
+
+
+@pytest.fixture
+def varied_book(book):
+    """A book of random recipes, then edited so the indexes have to keep up."""
+    generator = random.Random(7)
+    book.add_recipes(
+        Recipe(
+            f"{generator.choice(WORDS).title()} {generator.choice(['Soup', 'Pie', 'Salad'])}",
+            [Ingredient(name, "1 cup") for name in generator.sample(WORDS, generator.randint(0, 4))],
+            calories=generator.choice([None, 100.0, 250.0, 250.0, 400.0]),
+        )
+        for _ in range(60)
+    )
+    for recipe in book.get_all_recipes()[:10]:
+        book.update_recipe(recipe.title, Recipe(
+            recipe.title, [Ingredient(generator.choice(WORDS), "2 cups")], calories=250.0
+        ))
+    for recipe in book.get_all_recipes()[10:15]:
+        book.delete_recipe(recipe.title)
+    return book
+
+
+@pytest.mark.parametrize("included, excluded", [
+    ([], []),
+    (["garlic"], []),
+    (["GARLIC", "oil"], []),
+    (["egg"], ["eggplant"]),
+    ([], ["salt", "milk"]),
+    (["lime"], ["sub"]),
+    (["fraîche"], []),
+    (["l"], ["o"]),
+    (["saffron"], []),
+    ([], ["saffron"]),
+])
+def test_filter_by_ingredients_matches_a_scan(varied_book, included, excluded):
+    expected = reference_filter(varied_book.get_all_recipes(), included, excluded)
+    assert varied_book.filter_by_ingredients(included, excluded) == expected
+    assert varied_book.filter_by_ingredients(included or None, excluded or None) == expected
+
+
+def test_filter_matches_substrings_of_names(book):
+    book.add_recipes([
+        Recipe("Hummus", [Ingredient("Chickpeas", "1 can"), Ingredient("tahini", "2 tbsp")]),
+        Recipe("Roast", [Ingredient("chicken", "1")]),
+    ])
+    assert titles(book.filter_by_ingredients(["chick"])) == ["Hummus", "Roast"]
+    assert titles(book.filter_by_ingredients(["chick"], ["PEA"])) == ["Roast"]
+
+
+@pytest.mark.parametrize("query", [
+    "", "g", "li", "oil", "OLIVE", "soup", "garlic s", "me fr", "lime", "sublime pie", "saffron",
+])
+def test_search_recipes_matches_a_scan(varied_book, query):
+    expected = reference_search(varied_book.get_all_recipes(), query)
+    assert varied_book.search_recipes(query) == expected
+
+
+def test_search_finds_titles_and_ingredients_in_book_order(book):
+    book.add_recipes([
+        Recipe("Lemonade", [Ingredient("sugar", "1 cup")]),
+        Recipe("Fish", [Ingredient("Lemon", "1")]),
+        Recipe("Toast", [Ingredient("bread", "2 slices")]),
+        Recipe("Lemon Tart", [Ingredient("lemon zest", "1 tbsp")]),
+    ])
+    assert titles(book.search_recipes("LEMON")) == ["Lemonade", "Fish", "Lemon Tart"]
+    book.update_recipe("Fish", Recipe("Fish", [Ingredient("dill", "1 tbsp")]))
+    assert titles(book.search_recipes("lemon")) == ["Lemonade", "Lemon Tart"]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("sort_by", list(SortBy))
+def test_sort_recipes_matches_list_sort(varied_book, sort_by, reverse):
+    expected = sorted(
+        varied_book.get_all_recipes(), key=REFERENCE_SORT_KEYS[sort_by], reverse=reverse
+    )
+    assert varied_book.sort_recipes(sort_by, reverse) == expected
+    varied_book.add_recipe(Recipe("Aardvark Stew", calories=250.0))
+    varied_book.delete_recipe(expected[0].title)
+    expected = sorted(
+        varied_book.get_all_recipes(), key=REFERENCE_SORT_KEYS[sort_by], reverse=reverse
+    )
+    assert varied_book.sort_recipes(sort_by, reverse) == expected
+
+
+def test_reverse_sort_keeps_ties_in_book_order(book):
+    book.add_recipes([
+        Recipe("B", calories=100.0), Recipe("A"), Recipe("b", calories=100.0),
+        Recipe("C", calories=300.0), Recipe("D"),
+    ])
+    assert titles(book.sort_recipes(SortBy.ALPHABETICAL)) == ["A", "B", "b", "C", "D"]
+    assert titles(book.sort_recipes(SortBy.ALPHABETICAL, reverse=True)) == [
+        "D", "C", "B", "b", "A"
+    ]
+    assert titles(book.sort_recipes(SortBy.CALORIES)) == ["B", "b", "C", "A", "D"]
+    assert titles(book.sort_recipes(SortBy.CALORIES, reverse=True)) == [
+        "A", "D", "C", "B", "b"
+    ]
@@ -0,0 +1,196 @@
+"""
+RecipeBook transactions, rollback, duplicate titles and refresh, run
+against every storage backend.
+"""
+
+import threading
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe, RecipeBook, VersionConflictError
+
+
+def make_recipe(title, *names, instructions=""):
+    return Recipe(title, [Ingredient(name, "1 cup") for name in names], instructions)
+
+
+def titles(recipes):
+    return [recipe.title for recipe in recipes]
+
+
+def stored_titles(storage):
+    return titles(storage.get_all_recipes())
+
+
+def test_transaction_writes_changes_together(book, storage):
+    book.add_recipes([make_recipe("Omelette", "egg"), make_recipe("Toast", "bread")])
+    with book.transaction():
+        book.add_recipe(make_recipe("Pancakes", "flour", "milk"))
+        book.delete_recipe("Toast")
+        assert titles(book.get_all_recipes()) == ["Omelette", "Pancakes"]
+        assert stored_titles(storage) == ["Omelette", "Toast"]
+    assert stored_titles(storage) == ["Omelette", "Pancakes"]
+    assert titles(RecipeBook(storage).get_all_recipes()) == ["Omelette", "Pancakes"]
+
+
+def test_rollback_restores_book_and_storage(book, storage):
+    book.add_recipe(make_recipe("Omelette", "egg"))
+    with pytest.raises(RuntimeError):
+        with book.transaction():
+            book.add_recipe(make_recipe("Pancakes", "flour"))
+            book.update_recipe("Omelette", make_recipe("Omelette", "egg", "cheese"))
+            raise RuntimeError("abort")
+    assert titles(book.get_all_recipes()) == ["Omelette"]
+    assert book.get_recipe("Omelette").ingredients == [Ingredient("egg", "1 cup")]
+    assert book.filter_by_ingredients(["cheese"]) == []
+    assert stored_titles(storage) == ["Omelette"]
+
+
+def test_rollback_leaves_caller_recipes_untouched(book):
+    book.add_recipe(make_recipe("Omelette", "egg"))
+    added = make_recipe("Pancakes", "flour")
+    updated = make_recipe("Omelette", "egg", "cheese")
+    with pytest.raises(RuntimeError):
+        with book.transaction():
+            book.add_recipe(added)
+            book.update_recipe("Omelette", updated)
+            raise RuntimeError("abort")
+    assert added.version == 0
+    assert updated.version == 0
+
+
+def test_version_conflict_keeps_other_updates_retryable(book):
+    book.add_recipes([make_recipe(title, "egg") for title in ("A", "B", "C")])
+    updates = [
+        ("A", Recipe("A", [], "", 100.0, 1)),
+        ("B", Recipe("B", [], "", 200.0, 1)),
+        ("C", Recipe("C", [], "", 300.0, 0)),  # Stale
+    ]
+    with pytest.raises(VersionConflictError):
+        book.update_recipes(updates, check_versions=True)
+    assert book.update_recipes(updates[:2], check_versions=True) == [True, True]
+    assert [recipe.calories for recipe in book.get_all_recipes()] == [100.0, 200.0, None]
+
+
+def test_duplicate_titles_are_kept(book, storage, open_storage):
+    book.add_recipes([make_recipe("Soup", "carrot"), make_recipe("soup", "leek")])
+    book.update_recipe("Soup", make_recipe("Soup", "onion"))
+    assert [recipe.ingredients[0].name for recipe in storage.get_all_recipes()] == [
+        "onion", "leek"
+    ]
+    assert book.delete_recipe("SOUP")
+    assert stored_titles(storage) == []
+    assert book.get_all_recipes() == []
+
+
+def test_rename_onto_existing_title_keeps_both(book, storage):
+    book.add_recipes([make_recipe("Soup", "carrot"), make_recipe("Stew", "beef")])
+    book.update_recipe("Stew", make_recipe("Soup", "beef"))
+    assert stored_titles(storage) == ["Soup", "Soup"]
+    assert titles(book.get_all_recipes()) == ["Soup", "Soup"]
+    assert not book.refresh()
+
+
+def test_journal_replays_duplicate_titles(backend, book, storage, open_storage):
+    if backend != "journal":
+        pytest.skip("journal replay only")
+    book.add_recipes([make_recipe("Soup", "carrot"), make_recipe("Stew", "beef")])
+    book.add_recipe(make_recipe("Soup", "leek"))
+    book.update_recipe("Stew", make_recipe("Soup", "beef"))
+    storage.close()
+    reopened = open_storage()
+    assert [(recipe.title, recipe.version) for recipe in reopened.get_all_recipes()] == [
+        ("Soup", 1), ("Soup", 2), ("Soup", 1)
+    ]
+
+
+def test_update_of_recipe_renamed_in_place(book):
+    book.add_recipe(make_recipe("Omelette", "egg"))
+    recipe = book.get_recipe("Omelette")
+    recipe.title = "Fancy Omelette"
+    assert book.update_recipe("Omelette", recipe)
+    assert titles(book.get_all_recipes()) == ["Fancy Omelette"]
+    assert not book.has_recipe("Omelette")
+    assert titles(book.search_recipes("fancy")) == ["Fancy Omelette"]
+
+
+def test_failed_resync_keeps_original_error(book, storage, monkeypatch):
+    book.add_recipe(make_recipe("Omelette", "egg"))
+
+    def broken(*args, **kwargs):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(storage, "get_all_recipes", broken)
+    with pytest.raises(ValueError):
+        with book.transaction():
+            book.add_recipe(make_recipe("Pancakes", "flour"))
+            raise ValueError("abort")
+    monkeypatch.undo()
+    book.refresh()
+    assert titles(book.get_all_recipes()) == ["Omelette"]
+
+
+def test_refresh_picks_up_other_writers(book, other_storage):
+    book.add_recipe(make_recipe("Omelette", "egg"))
+    assert not book.refresh()
+    other_storage.add_recipe(make_recipe("Pancakes", "flour"))
+    other_storage.update_recipe("Omelette", make_recipe("Omelette", "egg", "ham"))
+    assert book.refresh()
+    assert titles(book.get_all_recipes()) == ["Omelette", "Pancakes"]
+    assert titles(book.filter_by_ingredients(["ham"])) == ["Omelette"]
+
+
+def test_refresh_after_delete_and_readd(book, other_storage):
+    book.add_recipe(make_recipe("Omelette", "egg"))
+    other_storage.delete_recipe("Omelette")
+    other_storage.add_recipe(make_recipe("Omelette", "tofu"))
+    assert book.refresh()
+    assert book.get_recipe("Omelette").ingredients == [Ingredient("tofu", "1 cup")]
+
+
+def test_write_just_before_a_batch_is_not_lost(book, other_storage):
+    book.add_recipe(make_recipe("Omelette", "egg"))
+    with book.transaction():
+        book.add_recipe(make_recipe("Pancakes", "flour"))
+        other_storage.add_recipe(make_recipe("Toast", "bread"))
+    assert sorted(titles(book.get_all_recipes())) == ["Omelette", "Pancakes", "Toast"]
+
+
+def test_load_during_transaction_does_not_deadlock(book):
+    book.add_recipes(make_recipe(f"Recipe {i}", "egg") for i in range(200))
+    loader = threading.Thread(target=book.load, kwargs={"chunk_size": 10})
+    with book.transaction():
+        loader.start()
+        loader.join(0.1)  # Blocked on the lock until the transaction ends
+        book.add_recipe(make_recipe("Nested", "egg"))
+        book.refresh()
+    loader.join(5)
+    assert not loader.is_alive()
+    assert book.has_recipe("Nested")
+    assert len(book.get_all_recipes()) == 201
+
+
+def test_similarity_index_follows_book_settings(storage):
+    book = RecipeBook(storage, similarity_bands=8, similarity_rows=2)
+    book.add_recipes([
+        make_recipe("Pancakes", "flour", "milk", "egg"),
+        make_recipe("Crepes", "flour", "milk", "egg", "butter"),
+        make_recipe("Salad", "lettuce", "tomato"),
+    ])
+    assert titles(book.similar_recipes("Pancakes")) == ["Crepes"]
+    index = book._similarity_index
+    assert (index.bands, index.rows) == (8, 2)
+
+
+def test_refresh_never_hands_out_indexed_copies(book, other_storage):
+    book.add_recipe(make_recipe("Soup", "carrot"))
+    other_storage.add_recipe(make_recipe("Soup", "carrot"))
+    assert book.refresh()
+    first, second = book.get_all_recipes()
+    assert second is not first
+    second.title = "Renamed"
+    assert book.update_recipe("Soup", make_recipe("Soup", "leek"))
+    assert [recipe.ingredients[0].name for recipe in book.get_all_recipes()] == [
+        "leek", "carrot"
+    ]
+    assert book.filter_by_ingredients(["carrot"]) == [second]
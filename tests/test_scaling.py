@@ -0,0 +1,50 @@
+"""
+Scaling amounts and recipes, and the units scaled amounts are shown in.
+"""
+
+import math
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe
+from recipe_manager.quantities import scale_amount
+from recipe_manager.scaling import scale_recipes
+
+
+@pytest.mark.parametrize("amount, factor, expected", [
+    ("3/4 cup", 2, "1 1/2 cups"),
+    ("48 tsp", 1, "1 cup"),
+    ("2 tbsp", 0.5, "1 tbsp"),
+    ("4 tbsp", 1, "1/4 cup"),
+    ("5 tbsp", 1, "5 tbsp"),
+    ("6 tbsp", 1, "6 tbsp"),
+    ("1 cup", 0.3, "4.8 tbsp"),
+    ("1/8 tsp", 1, "1/8 tsp"),
+    ("17 oz", 1, "17 oz"),
+    ("24 oz", 1, "1 1/2 lb"),
+    ("1500 g", 1, "1.5 kg"),
+    ("to taste", 3, "to taste"),
+])
+def test_scale_amount(amount, factor, expected):
+    assert scale_amount(amount, factor) == expected
+
+
+@pytest.mark.parametrize("factor", [0, -2, math.nan, math.inf])
+def test_rejects_non_positive_factors(factor):
+    recipe = Recipe("Toast", [Ingredient("bread", "2 slices")])
+    with pytest.raises(ValueError):
+        scale_amount("1 cup", factor)
+    with pytest.raises(ValueError):
+        recipe.scale(factor)
+    with pytest.raises(ValueError):
+        Recipe("Water").scale(factor)
+    with pytest.raises(ValueError):
+        scale_recipes([recipe], factor)
+
+
+def test_scale_recipes_matches_recipe_scale():
+    recipes = [
+        Recipe("Pancakes", [Ingredient("flour", "1 1/2 cups"), Ingredient("milk", "3/4 cup")], calories=520.0),
+        Recipe("Dressing", [Ingredient("oil", "3 tbsp"), Ingredient("salt", "to taste")]),
+    ]
+    assert scale_recipes(recipes, 2.5) == [recipe.scale(2.5) for recipe in recipes]
@@ -0,0 +1,75 @@
+"""
+Ranked full-text search: stemming, field boosts and top-k retrieval.
+"""
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe
+from recipe_manager.search import stem, tokenize
+
+
+def titles(recipes):
+    return [recipe.title for recipe in recipes]
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("cloves", "clove"), ("berries", "berry"), ("tomatoes", "tomato"),
+    ("dishes", "dish"), ("glasses", "glass"), ("hummus", "hummus"),
+    ("peas", "pea"), ("gas", "gas"), ("egg", "egg"),
+])
+def test_stem(word, expected):
+    assert stem(word) == expected
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("Toss the Tomatoes, then ADD 2 cloves!") == [
+        "toss", "tomato", "add", "2", "clove"
+    ]
+
+
+def test_plural_query_finds_singular_and_back(book):
+    book.add_recipes([
+        Recipe("Garlic Bread", [Ingredient("garlic cloves", "3")]),
+        Recipe("Aioli", [Ingredient("garlic clove", "1")]),
+    ])
+    assert titles(book.search_ranked("clove")) == titles(book.search_ranked("cloves"))
+    assert sorted(titles(book.search_ranked("clove"))) == ["Aioli", "Garlic Bread"]
+
+
+def test_title_outranks_ingredients_outranks_instructions(book):
+    book.add_recipes([
+        Recipe("Stew", [Ingredient("beef", "1 lb")], "Serve with lemon."),
+        Recipe("Roast Chicken", [Ingredient("lemon", "1")]),
+        Recipe("Lemon Tart", [Ingredient("flour", "1 cup")]),
+        Recipe("Salad", [Ingredient("lettuce", "1 head")]),
+    ])
+    assert titles(book.search_ranked("lemon")) == ["Lemon Tart", "Roast Chicken", "Stew"]
+
+
+def test_rare_terms_count_for_more(book):
+    book.add_recipes(
+        [Recipe(f"Pasta {i}", [Ingredient("garlic", "1 clove")]) for i in range(5)]
+        + [Recipe("Paella", [Ingredient("saffron", "1 pinch")])]
+    )
+    assert titles(book.search_ranked("garlic saffron"))[0] == "Paella"
+
+
+def test_limit_returns_the_best_prefix(book):
+    book.add_recipes(
+        Recipe(f"Soup {i}", [Ingredient("onion", "1")] * (i % 4 + 1)) for i in range(30)
+    )
+    everything = book.search_ranked("onion soup", limit=None)
+    assert len(everything) == 30
+    assert book.search_ranked("onion soup", limit=5) == everything[:5]
+    assert book.search_ranked("onion soup", limit=0) == []
+    assert book.search_ranked("the and of") == []
+
+
+def test_index_follows_changes(book):
+    book.add_recipes([Recipe("Omelette", [Ingredient("egg", "2")]), Recipe("Toast")])
+    assert titles(book.search_ranked("eggs")) == ["Omelette"]
+    book.update_recipe("Omelette", Recipe("Omelette", [Ingredient("tofu", "1 block")]))
+    book.update_recipe("Toast", Recipe("Eggy Bread", [Ingredient("egg", "1")]))
+    assert titles(book.search_ranked("eggs")) == ["Eggy Bread"]
+    book.delete_recipe("Eggy Bread")
+    assert book.search_ranked("egg") == []
@@ -0,0 +1,65 @@
+"""
+Shopping lists merging ingredients across recipes and units.
+"""
+
+import math
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe
+
+
+def amounts(items):
+    return {item.name: (item.amount, item.recipes) for item in items}
+
+
+@pytest.fixture
+def filled_book(book):
+    book.add_recipes([
+        Recipe("Pancakes", [
+            Ingredient("milk", "1 cup"), Ingredient("flour", "500g"),
+            Ingredient("salt", "to taste"), Ingredient("egg", "2"), Ingredient("sugar", "8 oz"),
+        ]),
+        Recipe("Bread", [
+            Ingredient("Milk", "4 tbsp"), Ingredient("flour", "1 kg"),
+            Ingredient("Salt", "a pinch"), Ingredient("eggs", "1"), Ingredient("sugar", "1 lb"),
+        ]),
+    ])
+    return book
+
+
+def test_merges_compatible_units(filled_book):
+    assert amounts(filled_book.shopping_list(["Pancakes", "Bread"])) == {
+        "egg": ("3", 2),
+        "flour": ("1.5 kg", 2),
+        "milk": ("1 1/4 cups", 2),
+        "salt": ("to taste, a pinch", 2),
+        "sugar": ("1 1/2 lb", 2),
+    }
+
+
+def test_multiplier_scales_totals(filled_book):
+    items = amounts(filled_book.shopping_list(["Pancakes", "Bread"], multiplier=0.5))
+    assert items["flour"] == ("750 g", 2)
+    assert items["sugar"] == ("12 oz", 2)
+    assert items["salt"] == ("to taste, a pinch", 2)
+
+
+def test_mixed_metric_and_imperial_totals_are_imperial(book):
+    book.add_recipes([
+        Recipe("A", [Ingredient("flour", "1 lb")]),
+        Recipe("B", [Ingredient("Flour", "454 g")]),
+    ])
+    assert amounts(book.shopping_list(["A", "B"])) == {"flour": ("2 lb", 2)}
+
+
+def test_title_given_twice_counts_twice(filled_book):
+    assert amounts(filled_book.shopping_list(["Pancakes", "pancakes"]))["egg"] == ("4", 2)
+
+
+def test_rejects_unknown_titles_and_bad_multipliers(filled_book):
+    with pytest.raises(ValueError):
+        filled_book.shopping_list(["Pancakes", "Waffles"])
+    for multiplier in (0, -2, math.inf, math.nan):
+        with pytest.raises(ValueError):
+            filled_book.shopping_list(["Pancakes"], multiplier=multiplier)
@@ -0,0 +1,62 @@
+"""
+RecipeStorage's JSON file: corrupt files, atomic replaces and durability.
+"""
+
+import json
+import os
+
+import pytest
+
+from recipe_manager import Durability, Recipe, RecipeStorage, StorageError
+from recipe_manager.storage import Mutation
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "recipes.json")
+
+
+def test_corrupt_file_raises_instead_of_reading_empty(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[{"title": "Soup"')
+    storage = RecipeStorage(path)
+    with pytest.raises(StorageError, match="corrupt"):
+        storage.get_all_recipes()
+    with pytest.raises(StorageError):
+        storage.add_recipe(Recipe("Stew"))
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == '[{"title": "Soup"'
+
+
+def test_failed_write_keeps_old_file(path, monkeypatch):
+    storage = RecipeStorage(path)
+    storage.add_recipe(Recipe("Soup"))
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(json, "dump", crash)
+    with pytest.raises(OSError):
+        storage.add_recipe(Recipe("Stew"))
+    monkeypatch.undo()
+    assert [recipe.title for recipe in storage.get_all_recipes()] == ["Soup"]
+    assert sorted(os.listdir(os.path.dirname(path))) == ["recipes.json", "recipes.json.lock"]
+
+
+@pytest.mark.parametrize("durability, fsyncs", [
+    (Durability.NONE, 0), (Durability.FSYNC, 1), (Durability.FULL, 2)
+])
+def test_batch_is_one_write(path, monkeypatch, durability, fsyncs):
+    storage = RecipeStorage(path, durability)
+    calls = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd) or fsync(fd))
+    storage.apply_batch([Mutation("add", title, Recipe(title)) for title in "ABC"])
+    assert len(calls) == fsyncs
+    assert [recipe.title for recipe in storage.get_all_recipes()] == ["A", "B", "C"]
+
+
+def test_durability_accepts_names(path):
+    assert RecipeStorage(path, "full").durability is Durability.FULL
+    with pytest.raises(ValueError):
+        RecipeStorage(path, "sometimes")
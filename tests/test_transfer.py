@@ -0,0 +1,52 @@
+"""
+Newline-delimited JSON import and export, plain and compressed.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from recipe_manager import Ingredient, Recipe, RecipeBook, RecipeStorage
+from recipe_manager.transfer import read_ndjson
+
+
+def fill_book(book):
+    book.add_recipes([
+        Recipe("Pancakes", [Ingredient("flour", "1 cup"), Ingredient("milk", "1 cup")]),
+        Recipe("Crème brûlée", [Ingredient("cream", "2 cups")], "Bake slowly.", 450.0),
+    ])
+
+
+@pytest.mark.parametrize("name", ["recipes.ndjson", "recipes.ndjson.gz"])
+def test_round_trip(book, tmp_path, name):
+    fill_book(book)
+    path = str(tmp_path / name)
+    assert book.export_ndjson(path) == 2
+    other = RecipeBook(RecipeStorage(str(tmp_path / "other.json")))
+    assert other.import_ndjson(path) == 2
+    assert [recipe.to_dict() for recipe in other.get_all_recipes()] == [
+        recipe.to_dict() for recipe in book.get_all_recipes()
+    ]
+
+
+def test_gzip_export_is_compressed_ndjson(book, tmp_path):
+    fill_book(book)
+    path = str(tmp_path / "recipes.ndjson.gz")
+    book.export_ndjson(path)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)["title"] for line in lines] == ["Pancakes", "Crème brûlée"]
+
+
+def test_blank_lines_are_skipped(tmp_path):
+    path = tmp_path / "recipes.ndjson"
+    path.write_text('{"title": "A"}\n\n{"title": "B"}\n', encoding="utf-8")
+    assert [recipe.title for recipe in read_ndjson(str(path))] == ["A", "B"]
+
+
+def test_invalid_line_names_its_position(tmp_path):
+    path = tmp_path / "recipes.ndjson"
+    path.write_text('{"title": "A"}\n{"name": "B"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match=r"recipes\.ndjson:2: invalid recipe"):
+        list(read_ndjson(str(path)))